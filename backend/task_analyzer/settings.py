@@ -56,6 +56,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
+    'tasks.memory.AnalysisMemoryMiddleware',
 ]
 
 ROOT_URLCONF = 'task_analyzer.urls'
@@ -90,6 +91,14 @@ DATABASES = {
 }
 
 
+# PRAGMAs applied to every new SQLite connection (see settings_api for the
+# production set) and optional batching of task writes into shared transactions
+SQLITE_PRAGMAS = {}
+TASK_WRITE_QUEUE = False
+TASK_WRITE_BATCH_SIZE = 64
+TASK_WRITE_MAX_WAIT_MS = 2
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -138,6 +147,33 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Limits enforced by the streaming parser on /analyze/ and /suggest/
+ANALYZE_MAX_BODY_BYTES = 50 * 1024 * 1024
+ANALYZE_MAX_TASKS = 100_000
+# Largest single JSON value (one task, one field) the parser will buffer
+ANALYZE_MAX_ITEM_BYTES = 1024 * 1024
+
+# Memory budget for /analyze/. Over budget, ANALYZE_OVER_BUDGET picks
+# 'reject' (413), 'stream' or 'project' (id/title/score/explanation only)
+ANALYZE_MEMORY_BUDGET_BYTES = 256 * 1024 * 1024
+ANALYZE_BYTES_PER_TASK = 4096
+ANALYZE_OVER_BUDGET = 'project'
+
+# Report tracemalloc peak allocation per analysis request (adds overhead)
+ANALYZE_TRACE_MEMORY = False
+
+# Ranked results kept for /analyze/page/ cursors: seconds since last
+# access, and the most analyses / ranked tasks held per process. The
+# task cap is what fits the memory budget above
+ANALYZE_RESULT_TTL = 600
+ANALYZE_RESULT_MAX_ENTRIES = 64
+ANALYZE_RESULT_MAX_TASKS = ANALYZE_MEMORY_BUDGET_BYTES // ANALYZE_BYTES_PER_TASK
+
+# Caps for /sensitivity/: weight vectors per request, and vectors x tasks
+# re-weightings before the request is rejected with 413
+SENSITIVITY_MAX_WEIGHT_VECTORS = 1000
+SENSITIVITY_MAX_EVALUATIONS = 2_000_000
+
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
     "http://127.0.0.1:3000",
@@ -169,8 +205,15 @@ CORS_ALLOW_HEADERS = [
     'authorization',
     'content-type',
     'dnt',
+    'if-none-match',
     'origin',
     'user-agent',
     'x-csrftoken',
     'x-requested-with',
-]
\ No newline at end of file
+]
+
+CORS_EXPOSE_HEADERS = [
+    'etag',
+    'x-analysis-peak-bytes',
+    'x-analysis-peak-bytes-per-task',
+]
@@ -0,0 +1,90 @@
+"""
+Lean production settings for the API-only scoring service.
+
+Select with DJANGO_SETTINGS_MODULE=task_analyzer.settings_api. Admin,
+sessions, messages, staticfiles and templates are dropped, and only the
+JSON renderer is enabled, which keeps worker cold start and per-request
+middleware cost down.
+"""
+
+import os
+
+from .settings import *  # noqa: F401,F403
+
+
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY', SECRET_KEY)
+
+DEBUG = False
+
+ALLOWED_HOSTS = os.environ.get('DJANGO_ALLOWED_HOSTS', 'localhost,127.0.0.1').split(',')
+
+
+# Application definition
+
+INSTALLED_APPS = [
+    #Third party apps
+    'rest_framework',
+    'corsheaders',
+
+    #Local apps
+    'tasks',
+]
+
+MIDDLEWARE = [
+    'corsheaders.middleware.CorsMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'tasks.memory.AnalysisMemoryMiddleware',
+]
+
+ROOT_URLCONF = 'task_analyzer.urls_api'
+
+TEMPLATES = []
+
+
+# Database
+# Keep connections open between requests instead of reconnecting each time,
+# and let SQLite readers and the writer proceed concurrently under WAL
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get('DJANGO_DB_PATH', BASE_DIR / 'db.sqlite3'),
+        'CONN_MAX_AGE': int(os.environ.get('DJANGO_CONN_MAX_AGE', 600)),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'timeout': 5,
+        },
+    }
+}
+
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+# Group concurrent create/update/delete requests into shared transactions
+TASK_WRITE_QUEUE = os.environ.get('TASK_WRITE_QUEUE', '1') == '1'
+
+AUTH_PASSWORD_VALIDATORS = []
+
+USE_I18N = False
+
+
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'rest_framework.renderers.JSONRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'rest_framework.parsers.JSONParser',
+    ],
+    # No users in this service, so skip authentication and permission
+    # checks on every request. DRF still imports django.contrib.auth,
+    # so this saves per-request work, not import time
+    'DEFAULT_AUTHENTICATION_CLASSES': [],
+    'DEFAULT_PERMISSION_CLASSES': [],
+    'UNAUTHENTICATED_USER': None,
+}
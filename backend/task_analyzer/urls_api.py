@@ -0,0 +1,6 @@
+"""URL configuration for the API-only deployment profile"""
+from django.urls import path, include
+
+urlpatterns = [
+    path('api/tasks/', include('tasks.urls')),
+]
@@ -0,0 +1,71 @@
+"""Scoring stage helpers, shared by the API pipeline and offline batches"""
+import logging
+import multiprocessing
+from datetime import date
+from typing import List, Dict, Any, Tuple
+
+from .scoring import ScoringContext, TaskScorer
+
+
+logger = logging.getLogger(__name__)
+
+ERROR_BREAKDOWN = {
+    'urgency': 0,
+    'importance': 0,
+    'effort': 0,
+    'dependency': 0,
+    'days_until_due': 0
+}
+
+# Per-process state set by the pool initializer
+_worker_state = {}
+
+
+def score_task(task: Dict, strategy: str, blocking_counts: Dict[Any, int],
+               context: ScoringContext) -> Tuple[float, Dict, Dict, str]:
+    """Score one task as (score, task, breakdown, explanation)
+    
+    A task that fails to score is kept with a zero score instead of
+    failing the whole batch.
+    """
+    try:
+        scoring = TaskScorer.calculate_priority_score(
+            task, [], strategy, blocking_counts=blocking_counts, context=context
+        )
+        explanation = TaskScorer.generate_explanation(task, scoring, strategy)
+        return scoring['score'], task, scoring['breakdown'], explanation
+    except Exception as e:
+        logger.error(f'Error scoring task {task.get("id", "unknown")}: {str(e)}')
+        return 0, task, dict(ERROR_BREAKDOWN), 'Error calculating score'
+
+
+def _init_worker(strategy: str, blocking_counts: Dict[Any, int], as_of: date):
+    _worker_state['strategy'] = strategy
+    _worker_state['blocking_counts'] = blocking_counts
+    _worker_state['context'] = ScoringContext(as_of)
+
+
+def _score_chunk(chunk: List[Dict]) -> List[Tuple]:
+    strategy = _worker_state['strategy']
+    blocking_counts = _worker_state['blocking_counts']
+    context = _worker_state['context']
+    return [score_task(task, strategy, blocking_counts, context) for task in chunk]
+
+
+def score_tasks(tasks: List[Dict], strategy: str, blocking_counts: Dict[Any, int],
+                context: ScoringContext, workers: int = 1,
+                chunk_size: int = 5000) -> List[Tuple]:
+    """Score every task, fanning out to a process pool when workers > 1"""
+    if workers <= 1 or len(tasks) <= chunk_size:
+        return [score_task(task, strategy, blocking_counts, context) for task in tasks]
+
+    chunks = [tasks[i:i + chunk_size] for i in range(0, len(tasks), chunk_size)]
+    with multiprocessing.Pool(
+        processes=workers,
+        initializer=_init_worker,
+        initargs=(strategy, blocking_counts, context.today)
+    ) as pool:
+        scored = []
+        for scored_chunk in pool.imap(_score_chunk, chunks):
+            scored.extend(scored_chunk)
+    return scored
@@ -0,0 +1,32 @@
+"""Strong ETag helpers for conditional GET/POST handling"""
+import hashlib
+
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def make_etag(*parts) -> str:
+    """Quoted strong ETag from a hash of the given parts"""
+    digest = hashlib.sha256()
+    for part in parts:
+        if not isinstance(part, bytes):
+            part = str(part).encode('utf-8')
+        digest.update(part)
+        digest.update(b'\0')
+    return quote_etag(digest.hexdigest()[:32])
+
+
+def etag_matches(request, etag: str) -> bool:
+    """True if the request's If-None-Match already holds `etag`"""
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    etags = parse_etags(header)
+    return '*' in etags or etag in etags
+
+
+def not_modified(etag: str) -> Response:
+    response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    response['ETag'] = etag
+    return response
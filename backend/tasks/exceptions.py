@@ -0,0 +1,11 @@
+"""API exceptions for the tasks app"""
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class PayloadTooLarge(APIException):
+    """Request body exceeds the configured analysis limits"""
+
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = 'Request payload too large.'
+    default_code = 'payload_too_large'
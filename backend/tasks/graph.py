@@ -0,0 +1,129 @@
+"""In-memory dependency index for stored tasks"""
+import threading
+from collections import deque
+from typing import Dict, Iterable, List, Set
+
+from .models import Task
+
+
+def normalize_dependency_id(dep_id):
+    """Stored dependencies may hold ints or numeric strings; map both to pk"""
+    try:
+        return int(dep_id)
+    except (TypeError, ValueError):
+        return None
+
+
+class DependencyIndex:
+    """
+    Adjacency index over stored `Task` dependencies.
+
+    Built lazily from the database on first use, then kept current by
+    the save/delete signal handlers, so ancestor and descendant queries
+    are a BFS over the result instead of repeated table scans. The
+    trigger-maintained change counter catches writes made by other
+    processes or without signals; checking it is one row lookup.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.nodes: Set[int] = set()
+            self.dependencies: Dict[int, Set[int]] = {}
+            self.dependents: Dict[int, Set[int]] = {}
+            self.version = None
+
+    def _current_version(self):
+        return Task.objects.version()
+
+    def _ensure_fresh(self):
+        version = self._current_version()
+        if version is None or version != self.version:
+            self.rebuild(version)
+
+    def rebuild(self, version=None):
+        """Reload every edge from the database"""
+        with self.lock:
+            self.reset()
+            for pk, dependencies in Task.objects.values_list('pk', 'dependencies'):
+                self._set_edges(pk, dependencies)
+            self.version = version
+
+    def _set_edges(self, pk: int, dependencies: Iterable):
+        self.nodes.add(pk)
+        new_deps = {
+            dep for dep in map(normalize_dependency_id, dependencies or [])
+            if dep is not None
+        }
+        old_deps = self.dependencies.get(pk, set())
+
+        for dep in old_deps - new_deps:
+            self.dependents.get(dep, set()).discard(pk)
+        for dep in new_deps - old_deps:
+            self.dependents.setdefault(dep, set()).add(pk)
+
+        self.dependencies[pk] = new_deps
+
+    def _advance(self, version) -> bool:
+        """
+        Move to `version`, the counter right after one local write.
+
+        Only valid if the index was at the version just before that write.
+        Otherwise some other change slipped in unseen, so the index is
+        marked stale and the next query rebuilds it.
+        """
+        if self.version is None:
+            return False
+        # Content hashes (no change triggers) cannot be stepped forward
+        if not isinstance(version, int) or self.version != version - 1:
+            self.version = None
+            return False
+        self.version = version
+        return True
+
+    def task_saved(self, pk: int, dependencies: Iterable, version=None):
+        """Apply one task's new edge set without a full rebuild"""
+        with self.lock:
+            if self._advance(version):
+                self._set_edges(pk, dependencies)
+
+    def task_deleted(self, pk: int, version=None):
+        """Drop a task's node and outgoing edges"""
+        with self.lock:
+            if self._advance(version):
+                self.nodes.discard(pk)
+                for dep in self.dependencies.pop(pk, set()):
+                    self.dependents.get(dep, set()).discard(pk)
+
+    def _walk(self, start: int, edges: Dict[int, Set[int]]) -> List[int]:
+        seen = {start}
+        order = []
+        queue = deque([start])
+        while queue:
+            for neighbour in edges.get(queue.popleft(), ()):
+                if neighbour in seen:
+                    continue
+                seen.add(neighbour)
+                queue.append(neighbour)
+                # Dangling ids are followed but never reported
+                if neighbour in self.nodes:
+                    order.append(neighbour)
+        return order
+
+    def ancestors(self, pk: int) -> List[int]:
+        """Tasks that must finish before `pk`, nearest first"""
+        with self.lock:
+            self._ensure_fresh()
+            return self._walk(pk, self.dependencies)
+
+    def descendants(self, pk: int) -> List[int]:
+        """Tasks that `pk` ultimately blocks, nearest first"""
+        with self.lock:
+            self._ensure_fresh()
+            return self._walk(pk, self.dependents)
+
+
+dependency_index = DependencyIndex()
@@ -0,0 +1,82 @@
+"""Compare startup time and per-request overhead of settings profiles"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+# Runs in a fresh interpreter so each profile pays its own import cost
+PROBE = '''
+import json, sys, time
+started = time.perf_counter()
+import django
+django.setup()
+from django.core.wsgi import get_wsgi_application
+from django.urls import resolve
+get_wsgi_application()
+resolve('/api/tasks/')
+startup = time.perf_counter() - started
+
+from django.test import Client
+client = Client(HTTP_HOST='localhost')
+body = json.dumps({'tasks': [
+    {'id': f'task_{i}', 'title': f'Task {i}', 'due_date': '2030-01-01',
+     'estimated_hours': 2, 'importance': 5, 'dependencies': []}
+    for i in range(TASKS)
+]})
+requests = REQUESTS
+client.post('/api/tasks/suggest/', data=body, content_type='application/json')
+started = time.perf_counter()
+for _ in range(requests):
+    response = client.post('/api/tasks/suggest/', data=body, content_type='application/json')
+    assert response.status_code == 200, response.status_code
+per_request = (time.perf_counter() - started) / requests
+print(json.dumps({
+    'startup_ms': startup * 1000,
+    'per_request_ms': per_request * 1000,
+    'modules_loaded': len(sys.modules),
+}))
+'''
+
+
+class Command(BaseCommand):
+    help = 'Benchmark cold start and per-request overhead of settings profiles'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--profiles', nargs='+',
+            default=['task_analyzer.settings', 'task_analyzer.settings_api'],
+            help='Settings modules to compare'
+        )
+        parser.add_argument('--runs', type=int, default=5, help='Fresh processes per profile')
+        parser.add_argument('--requests', type=int, default=200, help='Requests per process')
+        parser.add_argument('--tasks', type=int, default=10, help='Tasks per request body')
+
+    def handle(self, *args, **options):
+        probe = (
+            PROBE.replace('REQUESTS', str(options['requests']))
+                 .replace('TASKS', str(options['tasks']))
+        )
+        report = {}
+        for profile in options['profiles']:
+            samples = [self.run_probe(probe, profile) for _ in range(options['runs'])]
+            report[profile] = {
+                key: round(statistics.median(s[key] for s in samples), 3)
+                for key in samples[0]
+            }
+
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def run_probe(self, probe, profile):
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': profile}
+        result = subprocess.run(
+            [sys.executable, '-c', probe],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            raise CommandError(f'{profile} probe failed:\n{result.stderr}')
+        return json.loads(result.stdout.strip().splitlines()[-1])
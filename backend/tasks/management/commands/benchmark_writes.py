@@ -0,0 +1,166 @@
+"""Concurrent task-write benchmark for the SQLite storage modes"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from task_analyzer import settings_api
+
+
+MODES = {
+    'default': {
+        'conn_max_age': 0,
+        'pragmas': {},
+        'write_queue': False,
+    },
+    # Taken from the API profile so the benchmark measures what it deploys
+    'production': {
+        'conn_max_age': settings_api.DATABASES['default']['CONN_MAX_AGE'],
+        'pragmas': settings_api.SQLITE_PRAGMAS,
+        'write_queue': settings_api.TASK_WRITE_QUEUE,
+    },
+}
+
+# Each worker process boots Django against the scratch database with the
+# storage mode's settings patched in before setup
+PROBE = '''
+import json, os, sys, threading, time
+config = json.loads(os.environ['BENCH_CONFIG'])
+os.environ['DJANGO_SETTINGS_MODULE'] = 'task_analyzer.settings'
+from task_analyzer import settings as base
+base.DATABASES = {'default': {
+    'ENGINE': 'django.db.backends.sqlite3',
+    'NAME': config['db'],
+    'CONN_MAX_AGE': config['conn_max_age'],
+}}
+base.SQLITE_PRAGMAS = config['pragmas']
+base.TASK_WRITE_QUEUE = config['write_queue']
+import django
+django.setup()
+from django.core.management import call_command
+from django.db import OperationalError, close_old_connections, connection, transaction
+if config.get('migrate'):
+    call_command('migrate', verbosity=0)
+    sys.exit(0)
+
+from tasks.models import Task
+from tasks.serializers import TaskSerializer
+from tasks.storage import run_write
+
+stats = {'writes': 0, 'lock_errors': 0, 'other_errors': 0}
+lock = threading.Lock()
+
+def record(key):
+    with lock:
+        stats[key] += 1
+
+def write(worker, i, created):
+    instance = None
+    if created and i % 2:
+        instance = Task.objects.filter(pk=created[-1]).first()
+    serializer = TaskSerializer(instance, data={
+        'title': f'Bench {worker}-{i}', 'due_date': '2030-01-01',
+        'estimated_hours': 2, 'importance': 5, 'dependencies': [],
+    })
+    serializer.is_valid(raise_exception=True)
+    created.append(run_write(serializer.save).pk)
+
+def client(worker):
+    created = []
+    for i in range(config['writes']):
+        try:
+            # Like ATOMIC_REQUESTS: the read and the save share a transaction
+            if config['atomic']:
+                with transaction.atomic():
+                    write(worker, i, created)
+            else:
+                write(worker, i, created)
+            record('writes')
+        except OperationalError as e:
+            record('lock_errors' if 'locked' in str(e) else 'other_errors')
+        except Exception:
+            record('other_errors')
+        # Mirror request_finished: drop non-persistent connections
+        close_old_connections()
+    connection.close()
+
+started = time.perf_counter()
+threads = [threading.Thread(target=client, args=(n,)) for n in range(config['threads'])]
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+stats['elapsed'] = time.perf_counter() - started
+print(json.dumps(stats))
+'''
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare concurrent create/update throughput and lock errors between '
+        'the default SQLite setup and the production storage mode (WAL, busy '
+        'timeout, mmap, persistent connections, batched writes). Half the '
+        'writes are updates that read the task and save it in one transaction, '
+        'as a request does with ATOMIC_REQUESTS'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=2, help='Worker processes per mode')
+        parser.add_argument('--threads', type=int, default=8, help='Writer threads per process')
+        parser.add_argument('--writes', type=int, default=100, help='Writes per thread')
+        parser.add_argument('--modes', nargs='+', default=list(MODES), choices=list(MODES))
+        parser.add_argument(
+            '--autocommit', action='store_true',
+            help='Run every statement in autocommit instead of a per-write transaction'
+        )
+
+    def handle(self, *args, **options):
+        report = {}
+        for mode in options['modes']:
+            with tempfile.TemporaryDirectory() as tmp:
+                config = {
+                    **MODES[mode],
+                    'db': os.path.join(tmp, 'bench.sqlite3'),
+                    'threads': options['threads'],
+                    'writes': options['writes'],
+                    'atomic': not options['autocommit'],
+                }
+                self.run_probe({**config, 'migrate': True})
+
+                procs = [self.start_probe(config) for _ in range(options['processes'])]
+                results = [self.collect(proc) for proc in procs]
+
+            # Slowest worker's write phase, excluding interpreter startup
+            elapsed = max(r['elapsed'] for r in results)
+            writes = sum(r['writes'] for r in results)
+            report[mode] = {
+                'writes': writes,
+                'lock_errors': sum(r['lock_errors'] for r in results),
+                'other_errors': sum(r['other_errors'] for r in results),
+                'elapsed_s': round(elapsed, 3),
+                'writes_per_s': round(writes / elapsed, 1),
+            }
+
+        self.stdout.write(json.dumps(report, indent=2))
+
+    def start_probe(self, config):
+        return subprocess.Popen(
+            [sys.executable, '-c', PROBE],
+            cwd=settings.BASE_DIR,
+            env={**os.environ, 'BENCH_CONFIG': json.dumps(config)},
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+        )
+
+    def collect(self, proc):
+        stdout, stderr = proc.communicate()
+        if proc.returncode != 0:
+            raise CommandError(f'Benchmark worker failed:\n{stderr}')
+        lines = stdout.strip().splitlines()
+        return json.loads(lines[-1]) if lines else None
+
+    def run_probe(self, config):
+        self.collect(self.start_probe(config))
@@ -0,0 +1,290 @@
+"""HTTP load generator reporting latency percentiles"""
+import http.client
+import json
+import math
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.synthetic import generate_tasks
+
+
+DEFAULT_MIX = 'analyze=40,suggest=30,list=10,detail=8,create=6,update=4,delete=2'
+ENDPOINTS = ['analyze', 'suggest', 'list', 'detail', 'create', 'update', 'delete']
+
+
+def parse_mix(spec):
+    """Turn 'analyze=40,suggest=30' into {'analyze': 40, 'suggest': 30}"""
+    mix = {}
+    for part in spec.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise CommandError(f'Unknown endpoint {name!r} in --mix, use {", ".join(ENDPOINTS)}')
+        try:
+            mix[name] = float(weight)
+        except ValueError:
+            raise CommandError(f'Invalid weight for {name!r} in --mix')
+    if not any(mix.values()):
+        raise CommandError('--mix needs at least one positive weight')
+    return mix
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[rank]
+
+
+def summarize(latencies, statuses):
+    latencies = sorted(latencies)
+    errors = sum(count for code, count in statuses.items() if code == 0 or code >= 400)
+    total = len(latencies)
+    return {
+        'requests': total,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3) if total else None,
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3) if total else None,
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3) if total else None,
+        'mean_ms': round(sum(latencies) / total * 1000, 3) if total else None,
+        'errors': errors,
+        'error_rate': round(errors / total, 4) if total else 0.0,
+        'status_codes': {str(code): count for code, count in sorted(statuses.items())},
+    }
+
+
+class LoadClient:
+    """HTTP client with an optional keep-alive connection per worker thread"""
+
+    def __init__(self, base_url, timeout, keep_alive=False):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == 'https' else 80)
+        self.secure = parts.scheme == 'https'
+        self.prefix = parts.path.rstrip('/')
+        self.timeout = timeout
+        self.keep_alive = keep_alive
+        self.local = threading.local()
+
+    def connection(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            cls = http.client.HTTPSConnection if self.secure else http.client.HTTPConnection
+            conn = cls(self.host, self.port, timeout=self.timeout)
+            # Stored before connecting so a failed connect is closed too
+            self.local.conn = conn
+            conn.connect()
+            # Without this, delayed ACKs add ~40ms to every small request
+            conn.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return conn
+
+    def close(self):
+        """Close and forget this thread's connection, if any"""
+        conn = getattr(self.local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self.local.conn = None
+
+    def request(self, method, path, body=None):
+        """Return (status, parsed JSON or None); status 0 means a transport error"""
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        payload = json.dumps(body).encode('utf-8') if body is not None else None
+        try:
+            conn = self.connection()
+            conn.request(method, self.prefix + path, body=payload, headers=headers)
+            response = conn.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException):
+            self.close()
+            return 0, None
+        finally:
+            if not self.keep_alive:
+                self.close()
+        try:
+            return response.status, json.loads(data) if data else None
+        except ValueError:
+            return response.status, None
+
+
+class Command(BaseCommand):
+    help = (
+        'Drive the task API with a weighted request mix and report throughput, '
+        'latency percentiles and error rates as JSON. CRUD traffic writes to '
+        'the target database; created tasks are deleted at the end.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--base-url',
+            help='Target API root, e.g. http://127.0.0.1:8000/api/tasks '
+                 '(default: start a local server)'
+        )
+        parser.add_argument('--port', type=int, default=0, help='Port for the local server')
+        parser.add_argument('--requests', type=int, default=1000, help='Total requests to send')
+        parser.add_argument('--concurrency', type=int, default=8, help='Concurrent clients')
+        parser.add_argument('--tasks-per-request', type=int, default=50,
+                            help='Synthetic tasks per analyze/suggest body')
+        parser.add_argument('--mix', default=DEFAULT_MIX,
+                            help=f'Weighted endpoint mix (default: {DEFAULT_MIX})')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--timeout', type=float, default=30.0)
+        parser.add_argument(
+            '--keep-alive', action='store_true',
+            help='Reuse one connection per client (runserver adds ~40ms per '
+                 'keep-alive request, so this is off by default)'
+        )
+        parser.add_argument('--output', help='Also write the JSON report to this path')
+
+    def handle(self, *args, **options):
+        mix = parse_mix(options['mix'])
+        server = None
+        base_url = options['base_url']
+        if not base_url:
+            server, base_url = self.start_server(options['port'])
+
+        try:
+            report = self.run(
+                LoadClient(base_url, options['timeout'], options['keep_alive']),
+                mix, options
+            )
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+        report['base_url'] = base_url
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as handle:
+                handle.write(output)
+        self.stdout.write(output)
+
+    def start_server(self, port):
+        if not port:
+            with socket.socket() as sock:
+                sock.bind(('127.0.0.1', 0))
+                port = sock.getsockname()[1]
+
+        server = subprocess.Popen(
+            [sys.executable, 'manage.py', 'runserver', f'127.0.0.1:{port}', '--noreload'],
+            cwd=settings.BASE_DIR,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError('Local server exited during startup')
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+                return server, f'http://127.0.0.1:{port}/api/tasks'
+            except OSError:
+                time.sleep(0.1)
+        server.terminate()
+        raise CommandError('Local server did not start within 30s')
+
+    def run(self, client, mix, options):
+        rng = random.Random(options['seed'])
+        names = list(mix)
+        plan = rng.choices(names, weights=[mix[n] for n in names], k=options['requests'])
+
+        # A small pool of distinct bodies so repeats look like real traffic
+        bodies = [
+            {'tasks': generate_tasks(options['tasks_per_request'], seed=options['seed'] + i)}
+            for i in range(8)
+        ]
+        strategies = ['smart_balance', 'fastest_wins', 'high_impact', 'deadline_driven']
+
+        created_ids = []
+        ids_lock = threading.Lock()
+        latencies = defaultdict(list)
+        statuses = defaultdict(lambda: defaultdict(int))
+        stats_lock = threading.Lock()
+
+        def stored_task(idx):
+            return generate_tasks(1, seed=options['seed'] + idx)[0]
+
+        def pick_id(idx, remove=False):
+            with ids_lock:
+                if not created_ids:
+                    return None
+                pos = idx % len(created_ids)
+                return created_ids.pop(pos) if remove else created_ids[pos]
+
+        def send(idx, name):
+            if name in ('analyze', 'suggest'):
+                body = {**bodies[idx % len(bodies)], 'strategy': strategies[idx % len(strategies)]}
+                return client.request('POST', f'/{name}/', body)
+            if name == 'list':
+                return client.request('GET', '/')
+            if name == 'create':
+                task = stored_task(idx)
+                task.pop('id')
+                task['dependencies'] = []
+                status_code, data = client.request('POST', '/create/', task)
+                if status_code == 201 and data:
+                    with ids_lock:
+                        created_ids.append(data['id'])
+                return status_code, data
+
+            task_id = pick_id(idx, remove=(name == 'delete'))
+            if task_id is None:
+                # Nothing stored yet; fall back to a listing so the slot isn't wasted
+                return client.request('GET', '/')
+            if name == 'detail':
+                return client.request('GET', f'/{task_id}/')
+            if name == 'update':
+                task = stored_task(idx)
+                task.pop('id')
+                task['dependencies'] = []
+                return client.request('PUT', f'/{task_id}/', task)
+            return client.request('DELETE', f'/{task_id}/')
+
+        def worker(job):
+            idx, name = job
+            started = time.perf_counter()
+            status_code, _ = send(idx, name)
+            elapsed = time.perf_counter() - started
+            with stats_lock:
+                latencies[name].append(elapsed)
+                statuses[name][status_code] += 1
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            list(pool.map(worker, enumerate(plan)))
+        elapsed = time.perf_counter() - started
+
+        for task_id in created_ids:
+            client.request('DELETE', f'/{task_id}/')
+
+        all_statuses = defaultdict(int)
+        for per_endpoint in statuses.values():
+            for code, count in per_endpoint.items():
+                all_statuses[code] += count
+
+        return {
+            'requests': len(plan),
+            'concurrency': options['concurrency'],
+            'tasks_per_request': options['tasks_per_request'],
+            'keep_alive': options['keep_alive'],
+            'elapsed_s': round(elapsed, 3),
+            'throughput_rps': round(len(plan) / elapsed, 2) if elapsed else None,
+            'overall': summarize(
+                [latency for values in latencies.values() for latency in values],
+                all_statuses
+            ),
+            'endpoints': {
+                name: summarize(latencies[name], statuses[name])
+                for name in names if latencies[name]
+            },
+        }
@@ -0,0 +1,135 @@
+"""Memory accounting and budget guard for analysis requests"""
+import logging
+import threading
+import tracemalloc
+from contextlib import contextmanager
+
+from django.conf import settings
+
+from .exceptions import PayloadTooLarge
+
+
+logger = logging.getLogger('tasks.metrics')
+
+DEFAULT_MEMORY_BUDGET_BYTES = 256 * 1024 * 1024
+DEFAULT_BYTES_PER_TASK = 4096
+
+# Response modes, from most to least memory hungry
+FULL = 'full'
+STREAM = 'stream'
+PROJECT = 'project'
+REJECT = 'reject'
+
+
+def response_mode_for(task_count: int) -> str:
+    """
+    Pick how to answer an analysis of `task_count` tasks.
+
+    The estimate is `ANALYZE_BYTES_PER_TASK` per task. Over
+    `ANALYZE_MEMORY_BUDGET_BYTES`, `ANALYZE_OVER_BUDGET` decides whether
+    the request is rejected with 413 or downgraded to a streamed or
+    projected (id/title/score/explanation only) response.
+    """
+    budget = getattr(settings, 'ANALYZE_MEMORY_BUDGET_BYTES', DEFAULT_MEMORY_BUDGET_BYTES)
+    per_task = getattr(settings, 'ANALYZE_BYTES_PER_TASK', DEFAULT_BYTES_PER_TASK)
+    estimate = task_count * per_task
+    if budget is None or estimate <= budget:
+        return FULL
+
+    mode = getattr(settings, 'ANALYZE_OVER_BUDGET', PROJECT)
+    logger.warning(
+        'Analysis of %d tasks (~%d bytes) exceeds budget of %d bytes, mode=%s',
+        task_count, estimate, budget, mode
+    )
+    if mode == REJECT:
+        raise PayloadTooLarge(
+            f'Analysis of {task_count} tasks exceeds the memory budget'
+        )
+    return mode
+
+
+def budget_task_count():
+    """Tasks that fit the memory budget at the per-task estimate, or None without a budget"""
+    budget = getattr(settings, 'ANALYZE_MEMORY_BUDGET_BYTES', DEFAULT_MEMORY_BUDGET_BYTES)
+    per_task = getattr(settings, 'ANALYZE_BYTES_PER_TASK', DEFAULT_BYTES_PER_TASK)
+    if budget is None:
+        return None
+    return budget // per_task
+
+
+def rejected_task_limit():
+    """
+    Most tasks an analysis may hold when over-budget requests are
+    rejected, so the parser can stop at the first task past it.
+    None when `ANALYZE_OVER_BUDGET` downgrades instead of rejecting.
+    """
+    if getattr(settings, 'ANALYZE_OVER_BUDGET', PROJECT) != REJECT:
+        return None
+    return budget_task_count()
+
+
+# tracemalloc's peak is process-wide, so traced blocks run one at a time
+_trace_lock = threading.Lock()
+
+
+@contextmanager
+def trace_peak():
+    """
+    Measure peak traced allocation inside the block.
+
+    Traced blocks are serialized on a process-wide lock, because another
+    block's `reset_peak()` or `stop()` would corrupt the figures. Under a
+    threaded server this queues traced requests behind each other. Other
+    threads' allocations still count towards the peak, so figures are
+    upper bounds. `stats['peak']` stays None if tracing was stopped
+    elsewhere during the block.
+    """
+    stats = {'peak': None}
+    with _trace_lock:
+        started_here = not tracemalloc.is_tracing()
+        if started_here:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        try:
+            yield stats
+        finally:
+            if tracemalloc.is_tracing():
+                stats['peak'] = max(0, tracemalloc.get_traced_memory()[1] - baseline)
+                if started_here:
+                    tracemalloc.stop()
+
+
+class AnalysisMemoryMiddleware:
+    """
+    Reports peak allocation of analysis requests when
+    `ANALYZE_TRACE_MEMORY` is on.
+
+    Views mark a response with `analysis_task_count`. The peak covers
+    parsing, scoring and rendering, and is exported as
+    `X-Analysis-Peak-Bytes` / `X-Analysis-Peak-Bytes-Per-Task` headers
+    and a `tasks.metrics` log line.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, 'ANALYZE_TRACE_MEMORY', False) or request.method != 'POST':
+            return self.get_response(request)
+
+        with trace_peak() as stats:
+            response = self.get_response(request)
+
+        task_count = getattr(response, 'analysis_task_count', None)
+        if not task_count or stats['peak'] is None:
+            return response
+
+        per_task = stats['peak'] / task_count
+        response['X-Analysis-Peak-Bytes'] = str(stats['peak'])
+        response['X-Analysis-Peak-Bytes-Per-Task'] = f'{per_task:.0f}'
+        logger.info(
+            'analysis path=%s tasks=%d peak_bytes=%d peak_bytes_per_task=%.0f',
+            request.path, task_count, stats['peak'], per_task
+        )
+        return response
@@ -0,0 +1,42 @@
+from django.db import migrations, models
+
+
+TRIGGER_EVENTS = ('INSERT', 'UPDATE', 'DELETE')
+
+
+def install_change_triggers(apps, schema_editor):
+    TaskChangeCounter = apps.get_model('tasks', 'TaskChangeCounter')
+    TaskChangeCounter.objects.using(schema_editor.connection.alias).get_or_create(pk=1)
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for event in TRIGGER_EVENTS:
+        schema_editor.execute(
+            f'CREATE TRIGGER IF NOT EXISTS tasks_task_changed_{event.lower()} '
+            f'AFTER {event} ON tasks_task BEGIN '
+            f'UPDATE tasks_taskchangecounter SET value = value + 1 WHERE id = 1; END'
+        )
+
+
+def remove_change_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for event in TRIGGER_EVENTS:
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS tasks_task_changed_{event.lower()}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskChangeCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(install_change_triggers, remove_change_triggers),
+    ]
@@ -0,0 +1,48 @@
+from django.db import migrations
+
+
+def install_change_triggers(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    quote = schema_editor.quote_name
+    bump = (
+        f'UPDATE {quote("tasks_taskchangecounter")} '
+        f'SET {quote("value")} = {quote("value")} + 1 WHERE {quote("id")} = 1'
+    )
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE OR REPLACE FUNCTION tasks_task_changed() RETURNS trigger AS $$ '
+            f'BEGIN {bump}; RETURN NULL; END; $$ LANGUAGE plpgsql'
+        )
+        schema_editor.execute('DROP TRIGGER IF EXISTS tasks_task_changed ON tasks_task')
+        schema_editor.execute(
+            'CREATE TRIGGER tasks_task_changed AFTER INSERT OR UPDATE OR DELETE '
+            'ON tasks_task FOR EACH ROW EXECUTE FUNCTION tasks_task_changed()'
+        )
+    elif vendor == 'mysql':
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            name = f'tasks_task_changed_{event.lower()}'
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {name}')
+            schema_editor.execute(
+                f'CREATE TRIGGER {name} AFTER {event} ON tasks_task FOR EACH ROW {bump}'
+            )
+
+
+def remove_change_triggers(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('DROP TRIGGER IF EXISTS tasks_task_changed ON tasks_task')
+        schema_editor.execute('DROP FUNCTION IF EXISTS tasks_task_changed()')
+    elif vendor == 'mysql':
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS tasks_task_changed_{event.lower()}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0002_taskchangecounter'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_change_triggers, remove_change_triggers),
+    ]
@@ -1,7 +1,53 @@
-from django.db import models
+import hashlib
+import time
+
+from django.db import connections, models
 from django.core.validators import MinValueValidator, MaxValueValidator
 
 
+# Backends whose change triggers are installed by migrations 0002 and 0003
+CHANGE_TRIGGER_VENDORS = ('sqlite', 'postgresql', 'mysql')
+
+
+class TaskChangeCounter(models.Model):
+    """
+    Single-row counter bumped by database triggers on every insert,
+    update and delete of a task, including queryset updates and writes
+    from other processes.
+    """
+
+    value = models.BigIntegerField(default=0)
+
+
+class TaskQuerySet(models.QuerySet):
+    """Query helpers for stored tasks"""
+
+    def version(self):
+        """Stamp that changes whenever rows are added, edited or removed
+
+        One primary-key lookup of the change counter, independent of the
+        table size. A counter row removed by `flush` is recreated from the
+        clock, so its values never repeat a stamp from before the flush.
+        Backends without change triggers get `content_version()` instead.
+        """
+        if connections[self.db].vendor not in CHANGE_TRIGGER_VENDORS:
+            return self.content_version()
+        counter, _ = TaskChangeCounter.objects.using(self.db).get_or_create(
+            pk=1, defaults={'value': time.time_ns()}
+        )
+        return counter.value
+
+    def content_version(self):
+        """Hash of every stored row; O(n), for backends without triggers"""
+        digest = hashlib.sha256()
+        rows = self.order_by('pk').values_list(
+            'pk', 'title', 'due_date', 'estimated_hours', 'importance', 'dependencies'
+        )
+        for row in rows:
+            digest.update(repr(row).encode('utf-8'))
+        return digest.hexdigest()
+
+
 class Task(models.Model):
     """Task model with all priority factors"""
     
@@ -18,6 +64,8 @@ class Task(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = TaskQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
 
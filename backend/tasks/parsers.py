@@ -0,0 +1,263 @@
+"""Streaming request parser for the analysis endpoints"""
+import codecs
+import hashlib
+import json
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError, ValidationError
+from rest_framework.fields import SkipField, empty
+from rest_framework.parsers import BaseParser
+
+from .exceptions import PayloadTooLarge
+from .memory import rejected_task_limit
+from .serializers import (
+    AnalyzeRequestSerializer, SensitivityRequestSerializer, TaskInputSerializer
+)
+
+
+DEFAULT_MAX_BODY_BYTES = 50 * 1024 * 1024
+DEFAULT_MAX_TASKS = 100_000
+DEFAULT_MAX_ITEM_BYTES = 1024 * 1024
+
+_WHITESPACE = ' \t\n\r'
+
+
+class ValidatedAnalyzeRequest(dict):
+    """Analyze request body whose tasks were validated while streaming"""
+
+    # SHA-256 of the raw body, computed as it was read
+    body_hash = None
+
+
+class _JSONStream:
+    """Pull-based reader that decodes JSON values from a byte stream"""
+
+    def __init__(self, stream, encoding, chunk_size, max_bytes, max_item_bytes=DEFAULT_MAX_ITEM_BYTES):
+        self.stream = stream
+        self.decoder = codecs.getincrementaldecoder(encoding)()
+        self.json_decoder = json.JSONDecoder()
+        self.chunk_size = chunk_size
+        self.max_bytes = max_bytes
+        self.max_item_bytes = max_item_bytes
+        self.bytes_read = 0
+        self.digest = hashlib.sha256()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, min_chars: int = 1) -> bool:
+        """Append at least `min_chars` more text to the buffer
+
+        Returns False if nothing could be read because of EOF.
+        """
+        if self.eof:
+            return False
+
+        pieces = []
+        added = 0
+        while added < min_chars:
+            chunk = self.stream.read(self.chunk_size)
+            if not chunk:
+                self.eof = True
+                tail = self.decoder.decode(b'', final=True)
+                pieces.append(tail)
+                added += len(tail)
+                break
+
+            self.bytes_read += len(chunk)
+            self.digest.update(chunk)
+            if self.bytes_read > self.max_bytes:
+                raise PayloadTooLarge(
+                    f'Request body exceeds {self.max_bytes} bytes'
+                )
+            text = self.decoder.decode(chunk)
+            pieces.append(text)
+            added += len(text)
+
+        # Drop already consumed text so memory stays bounded by the
+        # current value; join once so a long read is not re-copied per chunk
+        self.buffer = self.buffer[self.pos:] + ''.join(pieces)
+        self.pos = 0
+        return added > 0
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, chars: str) -> str:
+        """Consume one of the given structural characters"""
+        char = self.peek()
+        if not char or char not in chars:
+            raise ParseError(
+                f'JSON parse error - expected one of {chars!r} at offset {self.pos}'
+            )
+        self.pos += 1
+        return char
+
+    def value(self):
+        """Decode one complete JSON value, reading more input as needed
+
+        An incomplete value is retried only after the unread text has
+        doubled, so a large value is re-scanned a logarithmic number of
+        times. A value still incomplete past `max_item_bytes` is rejected
+        instead of buffering the rest of the body.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self.json_decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as exc:
+                pending = len(self.buffer) - self.pos
+                if pending > self.max_item_bytes:
+                    raise ParseError(
+                        f'JSON parse error - {exc} (no complete value within '
+                        f'{self.max_item_bytes} bytes)'
+                    )
+                if self._fill(max(pending, 1)):
+                    continue
+                raise ParseError(f'JSON parse error - {exc}')
+
+            # A number or literal touching the end of the buffer may be cut off
+            if end == len(self.buffer) and self._fill():
+                continue
+
+            self.pos = end
+            return value
+
+
+class StreamingAnalyzeParser(BaseParser):
+    """
+    Parses analyze/suggest bodies incrementally.
+
+    The `tasks` array is decoded one item at a time and each task is
+    validated as it arrives, so only validated tasks are ever held in
+    memory. Oversized bodies and task lists are rejected with 413 as
+    soon as a limit is crossed.
+    """
+
+    media_type = 'application/json'
+    chunk_size = 64 * 1024
+    request_serializer_class = AnalyzeRequestSerializer
+    # Enforce the /analyze/ memory budget's reject mode while reading
+    memory_budget = False
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        max_bytes = getattr(settings, 'ANALYZE_MAX_BODY_BYTES', DEFAULT_MAX_BODY_BYTES)
+        max_tasks = getattr(settings, 'ANALYZE_MAX_TASKS', DEFAULT_MAX_TASKS)
+        max_item_bytes = getattr(settings, 'ANALYZE_MAX_ITEM_BYTES', DEFAULT_MAX_ITEM_BYTES)
+
+        request = parser_context.get('request')
+        if request is not None:
+            try:
+                content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+            except (TypeError, ValueError):
+                content_length = 0
+            if content_length > max_bytes:
+                raise PayloadTooLarge(
+                    f'Request body exceeds {max_bytes} bytes'
+                )
+
+        reader = _JSONStream(stream, encoding, self.chunk_size, max_bytes, max_item_bytes)
+        data = ValidatedAnalyzeRequest()
+        errors = {}
+
+        reader.expect('{')
+        if reader.peek() == '}':
+            reader.expect('}')
+        else:
+            while True:
+                key = reader.value()
+                if not isinstance(key, str):
+                    raise ParseError('JSON parse error - object keys must be strings')
+                reader.expect(':')
+
+                if key == 'tasks' and reader.peek() == '[':
+                    data['tasks'] = self._parse_tasks(reader, max_tasks, errors)
+                else:
+                    data[key] = reader.value()
+
+                if reader.expect(',}') == '}':
+                    break
+
+        if reader.peek():
+            raise ParseError('JSON parse error - trailing data after request body')
+
+        data.body_hash = reader.digest.hexdigest()
+        return self._finalize(data, errors)
+
+    def _parse_tasks(self, reader, max_tasks, errors):
+        """Decode and validate the tasks array item by item"""
+        tasks = []
+        reader.expect('[')
+        if reader.peek() == ']':
+            reader.expect(']')
+            return tasks
+
+        # One bound serializer reused for every item avoids re-copying its fields
+        validator = TaskInputSerializer()
+        budget_tasks = rejected_task_limit() if self.memory_budget else None
+        idx = 0
+        while True:
+            if idx >= max_tasks:
+                raise PayloadTooLarge(
+                    f'Too many tasks: at most {max_tasks} allowed per request'
+                )
+            if budget_tasks is not None and idx >= budget_tasks:
+                raise PayloadTooLarge(
+                    f'Analysis of more than {budget_tasks} tasks exceeds the memory budget'
+                )
+
+            try:
+                tasks.append(validator.run_validation(reader.value()))
+            except ValidationError as exc:
+                errors[idx] = exc.detail
+            idx += 1
+
+            if reader.expect(',]') == ']':
+                return tasks
+
+    def _finalize(self, data, errors):
+        """Validate the non-streamed fields the same way the serializer does"""
+        details = {}
+        if errors:
+            details['tasks'] = errors
+        elif not isinstance(data.get('tasks'), list):
+            # Missing or non-array `tasks` falls back to the serializer's messages
+            serializer = self.request_serializer_class(data=dict(data))
+            serializer.is_valid()
+            details.update(serializer.errors)
+
+        for name, field in self.request_serializer_class().fields.items():
+            if name == 'tasks':
+                continue
+            try:
+                data[name] = field.run_validation(data.get(name, empty))
+            except SkipField:
+                data.pop(name, None)
+            except ValidationError as exc:
+                details[name] = exc.detail
+
+        if details:
+            raise ParseError({'error': 'Invalid request data', 'details': details})
+
+        return data
+
+
+class AnalyzeRequestParser(StreamingAnalyzeParser):
+    """Streaming parser for /analyze/ bodies, which have a memory budget"""
+
+    memory_budget = True
+
+
+class SensitivityRequestParser(StreamingAnalyzeParser):
+    """Streaming parser for /sensitivity/ bodies"""
+
+    request_serializer_class = SensitivityRequestSerializer
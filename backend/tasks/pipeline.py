@@ -0,0 +1,314 @@
+"""Staged analysis pipeline shared by analyze, suggest and batch entry points"""
+import heapq
+import logging
+import time
+import traceback
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+
+from .batch import score_tasks
+from .etags import etag_matches, make_etag, not_modified
+from .memory import FULL, PROJECT, STREAM, response_mode_for
+from .parsers import ValidatedAnalyzeRequest
+from .results import StoredAnalysis, make_cursor, result_store
+from .scoring import ScoringContext, TaskScorer, DependencyAnalyzer
+from .serializers import AnalyzeRequestSerializer
+
+
+logger = logging.getLogger(__name__)
+
+
+def full_row(entry):
+    """Scored task as returned by the API: the input task plus its scores"""
+    score, task, breakdown, explanation = entry
+    return {
+        **task,
+        'priority_score': score,
+        'breakdown': breakdown,
+        'explanation': explanation
+    }
+
+
+def projected_row(entry):
+    """Scored task without the input copy and breakdown"""
+    score, task, breakdown, explanation = entry
+    return {
+        'id': task['id'],
+        'title': task['title'],
+        'priority_score': score,
+        'explanation': explanation
+    }
+
+
+class AnalysisState:
+    """Data shared between pipeline stages"""
+
+    def __init__(self, request=None):
+        self.request = request
+        self.validated_data = None
+        self.tasks = []
+        self.strategy = 'smart_balance'
+        self.context = None
+        self.etag = None
+        self.mode = FULL
+        self.task_dict = {}
+        self.blocking_counts = {}
+        self.has_circular = False
+        self.include_graph_report = False
+        self.graph_report = None
+        self.scored = []
+        self.ranked = []
+        self.components = []
+        self.sensitivity = None
+        self.response = None
+        self.timings = {}
+
+
+class AnalysisPipeline:
+    """
+    validate -> assign_ids -> build_graph -> check_cycles -> score -> rank -> render
+
+    Each stage reads and extends one `AnalysisState`. The graph stage
+    builds the id index and blocking counts once, so scoring is linear
+    and the cycle check reuses the same index. A stage may stop the run
+    by setting `state.response` (validation errors, 304s). When the
+    request asks for `include_graph_report`, the graph stage runs the
+    validating pass instead, which also settles the cycle check. Every stage
+    is timed into `state.timings`, and each hook is called as
+    `hook(stage, seconds, state)`.
+    """
+
+    STAGES = ('validate', 'assign_ids', 'build_graph', 'check_cycles', 'score', 'rank', 'render')
+    request_serializer_class = AnalyzeRequestSerializer
+
+    def __init__(self, renderer=None, top_k=None, detect_cycles=True,
+                 require_tasks=False, memory_budget=False, workers=1, hooks=()):
+        self.renderer = renderer
+        self.top_k = top_k
+        self.detect_cycles = detect_cycles
+        self.require_tasks = require_tasks
+        self.memory_budget = memory_budget
+        self.workers = workers
+        self.hooks = list(hooks)
+
+    def run(self, request):
+        """Run every stage for an API request and return its response"""
+        state = AnalysisState(request)
+        try:
+            self._run_stages(state, self.STAGES)
+        except APIException:
+            # Parse errors and 413s keep their own status codes
+            raise
+        except Exception as e:
+            logger.error(f'Error in {request.path}: {str(e)}\n{traceback.format_exc()}')
+            return Response(
+                {
+                    'error': 'Internal server error during analysis',
+                    'message': str(e)
+                },
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+        return state.response
+
+    def run_tasks(self, tasks, strategy='smart_balance', as_of=None):
+        """Score and rank already validated tasks, e.g. from a file"""
+        state = AnalysisState()
+        state.tasks = tasks
+        state.strategy = strategy
+        state.context = ScoringContext(as_of)
+        self._run_stages(state, self.STAGES[1:-1])
+        return state
+
+    def _run_stages(self, state, stages):
+        for name in stages:
+            started = time.perf_counter()
+            getattr(self, name)(state)
+            elapsed = time.perf_counter() - started
+            state.timings[name] = elapsed
+            for hook in self.hooks:
+                hook(name, elapsed, state)
+            if state.response is not None:
+                return
+
+    def validate(self, state):
+        request = state.request
+        data = request.data
+        if not isinstance(data, ValidatedAnalyzeRequest):
+            serializer = self.request_serializer_class(data=data)
+            if not serializer.is_valid():
+                state.response = Response(
+                    {'error': 'Invalid request data', 'details': serializer.errors},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+                return
+            data = serializer.validated_data
+
+        state.validated_data = data
+        state.tasks = data['tasks']
+        state.strategy = data.get('strategy', 'smart_balance')
+        state.context = ScoringContext(data.get('as_of'))
+        state.include_graph_report = data.get('include_graph_report', False)
+
+        # The streaming parser hashes the raw body as it reads it. Scores
+        # depend on the scoring day, so the same body ages out at midnight.
+        # Paged responses carry a short-lived cursor and are never 304'd.
+        body_hash = getattr(data, 'body_hash', None)
+        if body_hash is not None and not data.get('page_size'):
+            state.etag = make_etag(request.path, body_hash, state.context.today.isoformat())
+            if etag_matches(request, state.etag):
+                state.response = not_modified(state.etag)
+                return
+
+        if self.require_tasks and not state.tasks:
+            state.response = Response(
+                {'error': 'No tasks provided for analysis'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+            return
+
+        if self.memory_budget:
+            state.mode = response_mode_for(len(state.tasks))
+
+    def assign_ids(self, state):
+        for idx, task in enumerate(state.tasks):
+            if task.get('id') is None:
+                task['id'] = f'task_{idx}'
+
+    def build_graph(self, state):
+        if state.include_graph_report:
+            graph = DependencyAnalyzer.analyze_graph(state.tasks)
+            state.task_dict = graph['task_dict']
+            state.blocking_counts = graph['blocking_counts']
+            state.has_circular = graph['has_cycle']
+            state.graph_report = graph['report']
+            return
+        state.task_dict = {task['id']: task for task in state.tasks}
+        state.blocking_counts = TaskScorer.count_blocking(state.tasks)
+
+    def check_cycles(self, state):
+        if self.detect_cycles and state.graph_report is None:
+            state.has_circular = DependencyAnalyzer.detect_circular_dependencies(
+                state.tasks, state.task_dict
+            )
+
+    def score(self, state):
+        state.scored = score_tasks(
+            state.tasks, state.strategy, state.blocking_counts, state.context,
+            workers=self.workers
+        )
+
+    def rank(self, state):
+        rank_key = lambda entry: entry[0]
+        if self.top_k is not None:
+            state.ranked = heapq.nlargest(self.top_k, state.scored, key=rank_key)
+        else:
+            state.scored.sort(key=rank_key, reverse=True)
+            state.ranked = state.scored
+
+    def render(self, state):
+        response = self.renderer(state)
+        response.analysis_task_count = len(state.tasks)
+        if state.etag:
+            response['ETag'] = state.etag
+        response['Server-Timing'] = ', '.join(
+            f'{name};dur={seconds * 1000:.2f}' for name, seconds in state.timings.items()
+        )
+        state.response = response
+
+
+def render_analysis(state):
+    """Full ranking for /analyze/, downgraded when over the memory budget"""
+    page_size = state.validated_data.get('page_size')
+    if page_size:
+        return _first_page(state, page_size)
+
+    if state.mode == STREAM:
+        return _stream_analysis(state)
+
+    to_row = projected_row if state.mode == PROJECT else full_row
+    return Response(with_graph_report(state, {
+        'tasks': [to_row(entry) for entry in state.ranked],
+        'strategy_used': state.strategy,
+        'has_circular_dependencies': state.has_circular,
+        'response_mode': state.mode
+    }), status=status.HTTP_200_OK)
+
+
+def with_graph_report(state, body):
+    """Add the requested graph report to a response body"""
+    if state.graph_report is not None:
+        body['graph_report'] = state.graph_report
+    return body
+
+
+def _first_page(state, page_size):
+    """First page of the ranking, keeping the rest in the result store"""
+    stored = StoredAnalysis(state.ranked, {
+        'strategy_used': state.strategy,
+        'has_circular_dependencies': state.has_circular,
+        # A page is small enough to render whole, so only projection applies
+        'response_mode': PROJECT if state.mode == PROJECT else FULL
+    }, page_size)
+    token = None
+    if len(state.ranked) > page_size:
+        token = result_store.put(stored.entries, stored.meta, page_size)
+    return Response(
+        with_graph_report(state, page_body(token, stored, 0)),
+        status=status.HTTP_200_OK
+    )
+
+
+def page_body(token, stored, offset):
+    """One page of a ranked analysis with the cursor to the next page"""
+    end = offset + stored.page_size
+    to_row = projected_row if stored.meta['response_mode'] == PROJECT else full_row
+    return {
+        'tasks': [to_row(entry) for entry in stored.entries[offset:end]],
+        'offset': offset,
+        'total_tasks': len(stored.entries),
+        'next_cursor': make_cursor(token, end) if token and end < len(stored.entries) else None,
+        **stored.meta
+    }
+
+
+def _stream_analysis(state):
+    """Render ranked tasks one row at a time instead of building the whole body"""
+    encoder = DjangoJSONEncoder()
+
+    def chunks():
+        yield '{"tasks": ['
+        for idx, entry in enumerate(state.ranked):
+            yield (',' if idx else '') + encoder.encode(full_row(entry))
+        yield '], ' + encoder.encode(with_graph_report(state, {
+            'strategy_used': state.strategy,
+            'has_circular_dependencies': state.has_circular,
+            'response_mode': STREAM
+        }))[1:]
+
+    return StreamingHttpResponse(chunks(), content_type='application/json')
+
+
+def render_suggestions(state):
+    """Top picks for /suggest/"""
+    return Response(with_graph_report(state, {
+        'suggested_tasks': [full_row(entry) for entry in state.ranked],
+        'total_tasks_analyzed': len(state.tasks),
+        'strategy_used': state.strategy,
+        'has_circular_dependencies': state.has_circular
+    }), status=status.HTTP_200_OK)
+
+
+analyze_pipeline = AnalysisPipeline(
+    renderer=render_analysis,
+    require_tasks=True,
+    memory_budget=True
+)
+
+suggest_pipeline = AnalysisPipeline(
+    renderer=render_suggestions,
+    top_k=3
+)
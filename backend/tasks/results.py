@@ -0,0 +1,117 @@
+"""Bounded, TTL-evicted store of ranked analyses for cursor paging"""
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+
+from .memory import budget_task_count
+
+
+DEFAULT_TTL_SECONDS = 600
+DEFAULT_MAX_ENTRIES = 64
+
+
+def make_cursor(token: str, offset: int) -> str:
+    return f'{token}.{offset}'
+
+
+def parse_cursor(cursor: str) -> Tuple[str, int]:
+    """Split a cursor into (token, offset); raises ValueError if malformed"""
+    token, _, offset = (cursor or '').rpartition('.')
+    offset = int(offset)
+    if not token or offset < 0:
+        raise ValueError(f'Malformed cursor: {cursor!r}')
+    return token, offset
+
+
+class StoredAnalysis:
+    """Ranked entries of one analysis plus what is needed to render a page"""
+
+    def __init__(self, entries: List[Tuple], meta: Dict, page_size: int):
+        self.entries = entries
+        self.meta = meta
+        self.page_size = page_size
+        self.expires_at = 0.0
+
+
+class ResultStore:
+    """
+    Ranked analysis results kept server-side between page requests.
+
+    Entries live for `ttl` seconds since their last access. The store
+    holds at most `max_entries` analyses and `max_tasks` ranked tasks in
+    total, evicting the least recently used first (a single analysis
+    larger than `max_tasks` is kept alone). `max_tasks` defaults to the
+    tasks that fit the analysis memory budget, so stored results cost
+    about as much as one full-size analysis. Pages are list slices, so
+    fetching one costs O(page) regardless of the analysis size.
+
+    Results are held per process: with several server workers, a cursor
+    only resolves on the worker that created it.
+    """
+
+    def __init__(self, ttl=None, max_entries=None, max_tasks=None, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_tasks = max_tasks
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.analyses: 'OrderedDict[str, StoredAnalysis]' = OrderedDict()
+        self.task_count = 0
+
+    def _limit(self, name, value, default):
+        if value is not None:
+            return value
+        return getattr(settings, name, default)
+
+    def put(self, entries: List[Tuple], meta: Dict, page_size: int) -> str:
+        """Store a ranked analysis and return its token"""
+        token = secrets.token_urlsafe(16)
+        stored = StoredAnalysis(entries, meta, page_size)
+        with self.lock:
+            now = self.clock()
+            stored.expires_at = now + self._limit('ANALYZE_RESULT_TTL', self.ttl, DEFAULT_TTL_SECONDS)
+            self.analyses[token] = stored
+            self.task_count += len(entries)
+            self._evict(now)
+        return token
+
+    def get(self, token: str) -> Optional[StoredAnalysis]:
+        """The stored analysis for `token`, refreshing its TTL, or None"""
+        with self.lock:
+            now = self.clock()
+            self._evict(now)
+            stored = self.analyses.get(token)
+            if stored is None:
+                return None
+            stored.expires_at = now + self._limit('ANALYZE_RESULT_TTL', self.ttl, DEFAULT_TTL_SECONDS)
+            self.analyses.move_to_end(token)
+            return stored
+
+    def _evict(self, now: float):
+        # Sliding TTLs keep the oldest access at the front, so expired
+        # entries and LRU victims are both popped from there
+        max_entries = self._limit('ANALYZE_RESULT_MAX_ENTRIES', self.max_entries, DEFAULT_MAX_ENTRIES)
+        max_tasks = self._limit('ANALYZE_RESULT_MAX_TASKS', self.max_tasks, None)
+        if max_tasks is None:
+            max_tasks = budget_task_count()
+        while self.analyses:
+            oldest = next(iter(self.analyses.values()))
+            over_limit = len(self.analyses) > max_entries or (
+                max_tasks is not None and self.task_count > max_tasks and len(self.analyses) > 1
+            )
+            if oldest.expires_at > now and not over_limit:
+                break
+            self.analyses.popitem(last=False)
+            self.task_count -= len(oldest.entries)
+
+    def clear(self):
+        with self.lock:
+            self.analyses.clear()
+            self.task_count = 0
+
+
+result_store = ResultStore()
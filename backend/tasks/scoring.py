@@ -3,6 +3,38 @@ from datetime import datetime, date
 from typing import List, Dict, Any
 
 
+class ScoringContext:
+    """
+    Scoring state shared by every task in one request.
+    
+    Holds a single `today` so a request that spans midnight is scored
+    consistently, and memoizes parsed due dates and urgency by day offset.
+    """
+    
+    def __init__(self, as_of: date = None):
+        self.today = as_of or date.today()
+        self._parsed_dates = {}
+        self._urgency_by_offset = {}
+    
+    def days_until(self, due_date) -> int:
+        """Days from `today` until `due_date` (a date or YYYY-MM-DD string)"""
+        if isinstance(due_date, str):
+            parsed = self._parsed_dates.get(due_date)
+            if parsed is None:
+                parsed = datetime.strptime(due_date, '%Y-%m-%d').date()
+                self._parsed_dates[due_date] = parsed
+            due_date = parsed
+        return (due_date - self.today).days
+    
+    def urgency(self, days_until_due: int) -> float:
+        """Memoized `TaskScorer.urgency_for_offset`"""
+        urgency = self._urgency_by_offset.get(days_until_due)
+        if urgency is None:
+            urgency = TaskScorer.urgency_for_offset(days_until_due)
+            self._urgency_by_offset[days_until_due] = urgency
+        return urgency
+
+
 class TaskScorer:
     """Handles task priority scoring"""
     
@@ -36,15 +68,8 @@ class TaskScorer:
 
 
     @staticmethod
-    def calculate_urgency_score(due_date) -> float:
-        """Calculate urgency based on days until due"""
-        
-        # Convert string to date if needed
-        if isinstance(due_date, str):
-            due_date = datetime.strptime(due_date, '%Y-%m-%d').date()
-        
-        today = date.today()
-        days_until_due = (due_date - today).days
+    def urgency_for_offset(days_until_due: int) -> float:
+        """Urgency step function of days until due"""
         
         # Overdue tasks get exponentially higher scores
         if days_until_due < 0:
@@ -61,6 +86,12 @@ class TaskScorer:
             return 30
         else:
             return max(0, 30 - days_until_due)
+    
+    @classmethod
+    def calculate_urgency_score(cls, due_date, context: 'ScoringContext' = None) -> float:
+        """Calculate urgency based on days until due"""
+        context = context or ScoringContext()
+        return context.urgency(context.days_until(due_date))
         
     @staticmethod
     def calculate_importance_score(importance: int) -> float:
@@ -82,11 +113,57 @@ class TaskScorer:
                 blocking_count += 1
         return blocking_count * 20
     
+    @staticmethod
+    def count_blocking(all_tasks: List[Dict]) -> Dict[Any, int]:
+        """Map each task id to how many tasks depend on it, in one pass"""
+        counts = {}
+        for task in all_tasks:
+            for dep_id in set(task.get('dependencies', [])):
+                counts[dep_id] = counts.get(dep_id, 0) + 1
+        return counts
+    
+    @classmethod
+    def calculate_components(cls, task: Dict, all_tasks: List[Dict],
+                             blocking_counts: Dict[Any, int] = None,
+                             context: 'ScoringContext' = None) -> Dict:
+        """Unweighted component scores of one task, before any strategy"""
+        context = context or ScoringContext()
+        days_until_due = context.days_until(task['due_date'])
+        if blocking_counts is not None:
+            dependency = blocking_counts.get(task.get('id'), 0) * 20
+        else:
+            dependency = cls.calculate_dependency_score(task.get('id'), all_tasks)
+        return {
+            'urgency': context.urgency(days_until_due),
+            'importance': cls.calculate_importance_score(task['importance']),
+            'effort': cls.calculate_effort_score(task['estimated_hours']),
+            'dependency': dependency,
+            'days_until_due': days_until_due
+        }
+    
+    @staticmethod
+    def weighted_score(urgency: float, importance: float, effort: float,
+                       dependency: float, weights: Dict[str, float]) -> float:
+        """Combine component scores with one strategy's weights"""
+        return round(
+            urgency * weights['urgency'] +
+            importance * weights['importance'] +
+            effort * weights['effort'] +
+            dependency * weights['dependency'],
+            2
+        )
+    
     @classmethod
     def calculate_priority_score(cls, task: Dict, all_tasks: List[Dict], 
-                                 strategy: str = 'smart_balance') -> Dict:
-        """Calculate comprehensive priority score"""
+                                 strategy: str = 'smart_balance',
+                                 blocking_counts: Dict[Any, int] = None,
+                                 context: 'ScoringContext' = None) -> Dict:
+        """Calculate comprehensive priority score
         
+        Pass `blocking_counts` from `count_blocking` to avoid rescanning
+        `all_tasks` for every task when scoring a whole batch, and one
+        shared `context` so every task is scored against the same day.
+        """
         # Validate strategy
         if strategy not in cls.STRATEGY_WEIGHTS:
             strategy = 'smart_balance'
@@ -94,34 +171,23 @@ class TaskScorer:
         weights = cls.STRATEGY_WEIGHTS[strategy]
         
         # Calculate component scores
-        urgency = cls.calculate_urgency_score(task['due_date'])
-        importance = cls.calculate_importance_score(task['importance'])
-        effort = cls.calculate_effort_score(task['estimated_hours'])
-        dependency = cls.calculate_dependency_score(task.get('id'), all_tasks)
+        components = cls.calculate_components(task, all_tasks, blocking_counts, context)
+        urgency = components['urgency']
+        importance = components['importance']
+        effort = components['effort']
+        dependency = components['dependency']
         
         # Calculate weighted final score
-        final_score = (
-            urgency * weights['urgency'] +
-            importance * weights['importance'] +
-            effort * weights['effort'] +
-            dependency * weights['dependency']
-        )
-        
-        # Calculate days until due for context
-        if isinstance(task['due_date'], str):
-            due_date = datetime.strptime(task['due_date'], '%Y-%m-%d').date()
-        else:
-            due_date = task['due_date']
-        days_until_due = (due_date - date.today()).days
+        final_score = cls.weighted_score(urgency, importance, effort, dependency, weights)
         
         return {
-            'score': round(final_score, 2),
+            'score': final_score,
             'breakdown': {
                 'urgency': round(urgency, 2),
                 'importance': round(importance, 2),
                 'effort': round(effort, 2),
                 'dependency': round(dependency, 2),
-                'days_until_due': days_until_due
+                'days_until_due': components['days_until_due']
             }
         }
     
@@ -156,8 +222,11 @@ class DependencyAnalyzer:
     """Handles dependency analysis"""
     
     @staticmethod
-    def detect_circular_dependencies(tasks: List[Dict]) -> bool:
-        """Detect circular dependencies using DFS"""
+    def detect_circular_dependencies(tasks: List[Dict], task_dict: Dict = None) -> bool:
+        """Detect circular dependencies using DFS
+        
+        Pass a prebuilt id -> task `task_dict` to skip rebuilding it.
+        """
         visited = set()
         rec_stack = set()
         
@@ -180,11 +249,91 @@ class DependencyAnalyzer:
             rec_stack.remove(task_id)
             return False
         
-        task_dict = {task['id']: task for task in tasks if 'id' in task}
+        if task_dict is None:
+            task_dict = {task['id']: task for task in tasks if 'id' in task}
         
         for task in tasks:
             if 'id' in task and task['id'] not in visited:
                 if has_cycle(task['id'], task_dict):
                     return True
         
-        return False
\ No newline at end of file
+        return False
+    
+    @staticmethod
+    def analyze_graph(tasks: List[Dict]) -> Dict:
+        """Validate the dependency graph in one linear pass
+        
+        Reports dangling references, self-loops, duplicate ids, isolated
+        tasks, the longest dependency chain and the fan-in distribution.
+        Also returns the id -> task index (last duplicate wins, as with a
+        plain dict), blocking counts matching `TaskScorer.count_blocking`
+        and whether a cycle exists, so callers need no further traversal.
+        """
+        task_dict = {}
+        duplicate_ids = []
+        blocking_counts = {}
+        for task in tasks:
+            task_id = task.get('id')
+            if task_id in task_dict:
+                duplicate_ids.append(task_id)
+            task_dict[task_id] = task
+            for dep_id in set(task.get('dependencies', [])):
+                blocking_counts[dep_id] = blocking_counts.get(dep_id, 0) + 1
+        duplicate_ids = list(dict.fromkeys(duplicate_ids))
+        
+        dangling = []
+        self_loops = []
+        isolated = []
+        fan_in = {}
+        dependents = {}
+        pending = {}
+        for task_id, task in task_dict.items():
+            deps = set(task.get('dependencies', []))
+            missing = sorted(str(dep_id) for dep_id in deps if dep_id not in task_dict)
+            if missing:
+                dangling.append({'task_id': task_id, 'missing': missing})
+            if task_id in deps:
+                self_loops.append(task_id)
+            
+            known = [dep_id for dep_id in deps if dep_id in task_dict]
+            pending[task_id] = len(known)
+            for dep_id in known:
+                dependents.setdefault(dep_id, []).append(task_id)
+            
+            count = blocking_counts.get(task_id, 0)
+            fan_in[count] = fan_in.get(count, 0) + 1
+            if not known and not count:
+                isolated.append(task_id)
+        
+        # Kahn's algorithm: a task's depth is one more than its deepest
+        # dependency. Tasks on a cycle never reach zero pending dependencies,
+        # so they are never popped and never get a final depth.
+        reached = {task_id: 1 for task_id, left in pending.items() if not left}
+        ready = list(reached)
+        depth = {}
+        processed = 0
+        while ready:
+            task_id = ready.pop()
+            processed += 1
+            depth[task_id] = reached[task_id]
+            for dependent in dependents.get(task_id, ()):
+                reached[dependent] = max(reached.get(dependent, 1), depth[task_id] + 1)
+                pending[dependent] -= 1
+                if not pending[dependent]:
+                    ready.append(dependent)
+        
+        return {
+            'task_dict': task_dict,
+            'blocking_counts': blocking_counts,
+            'has_cycle': processed < len(task_dict),
+            'report': {
+                'task_count': len(tasks),
+                'dangling_dependencies': dangling,
+                'self_loops': self_loops,
+                'duplicate_ids': duplicate_ids,
+                'isolated_tasks': isolated,
+                'max_chain_depth': max(depth.values(), default=0),
+                'fan_in_distribution': {str(k): fan_in[k] for k in sorted(fan_in)},
+                'max_fan_in': max(fan_in, default=0),
+            }
+        }
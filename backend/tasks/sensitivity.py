@@ -0,0 +1,242 @@
+"""What-if analysis: how stable the ranking is under perturbed strategy weights"""
+import logging
+import random
+from array import array
+from itertools import product
+from operator import mul
+from typing import Dict, List, Tuple
+
+from django.conf import settings
+from rest_framework import status
+from rest_framework.response import Response
+
+from .exceptions import PayloadTooLarge
+from .pipeline import AnalysisPipeline, with_graph_report
+from .scoring import TaskScorer
+from .serializers import SensitivityRequestSerializer
+
+
+logger = logging.getLogger(__name__)
+
+COMPONENTS = ('urgency', 'importance', 'effort', 'dependency')
+
+DEFAULT_MAX_WEIGHT_VECTORS = 1000
+DEFAULT_MAX_EVALUATIONS = 2_000_000
+
+
+def vector_count(method: str, samples: int, steps: int) -> int:
+    """Number of weight vectors a request asks for"""
+    return steps ** len(COMPONENTS) if method == 'grid' else samples
+
+
+def weight_vectors(base: Dict[str, float], method: str = 'random', samples: int = 200,
+                   steps: int = 3, spread: float = 0.05, seed: int = None) -> List[Dict[str, float]]:
+    """
+    Perturbed copies of the `base` strategy weights.
+
+    Every weight is shifted by up to +/- `spread`, clipped at zero and the
+    vector renormalized to sum to 1. `random` draws `samples` vectors,
+    `grid` takes `steps` evenly spaced shifts per weight (steps ** 4
+    vectors). Vectors that clip to all zeros are dropped.
+    """
+    base_values = [base[name] for name in COMPONENTS]
+    if method == 'grid':
+        offsets = [-spread + 2 * spread * i / (steps - 1) for i in range(steps)]
+        shifts = product(offsets, repeat=len(COMPONENTS))
+    else:
+        rng = random.Random(seed)
+        shifts = ([rng.uniform(-spread, spread) for _ in COMPONENTS] for _ in range(samples))
+
+    vectors = []
+    for shift in shifts:
+        clipped = [max(0.0, weight + delta) for weight, delta in zip(base_values, shift)]
+        total = sum(clipped)
+        if total:
+            vectors.append({name: weight / total for name, weight in zip(COMPONENTS, clipped)})
+    return vectors
+
+
+def default_seed(data) -> int:
+    """
+    The request's seed, else one derived from the raw body hash.
+
+    Identical bodies then draw identical vectors, which keeps the
+    body-based ETag honest. Without a body hash (no streaming parser)
+    and no seed, vectors are random per call.
+    """
+    if data.get('seed') is not None:
+        return data['seed']
+    body_hash = getattr(data, 'body_hash', None)
+    return int(body_hash[:16], 16) if body_hash else None
+
+
+def rank_order(components: List[Tuple], weights: Dict[str, float],
+               rounded: bool = True) -> Tuple[List[int], List[float]]:
+    """Task indices best first under `weights`, plus their scores
+
+    Scores are `TaskScorer.weighted_score` inlined for speed. Ties keep
+    input order, as in the /analyze/ ranking. Rounding dominates the
+    cost, so perturbed vectors skip it; it only decides exact ties.
+    """
+    w_urgency, w_importance, w_effort, w_dependency = (weights[name] for name in COMPONENTS)
+    scores = [
+        urgency * w_urgency + importance * w_importance +
+        effort * w_effort + dependency * w_dependency
+        for urgency, importance, effort, dependency in components
+    ]
+    if rounded:
+        scores = [round(score, 2) for score in scores]
+    return sorted(range(len(scores)), key=scores.__getitem__, reverse=True), scores
+
+
+def rank_stability(components: List[Tuple], base: Dict[str, float],
+                   vectors: List[Dict[str, float]], top_k: int) -> Dict:
+    """
+    Re-rank precomputed component scores under every weight vector.
+
+    Returns the base ranking, per-task stats aligned with `components`
+    (top-k frequency, mean rank, rank variance, best and worst rank) and
+    the share of vectors whose top-k set equals the base top-k set.
+    Ranks are 1-based.
+    """
+    count = len(components)
+    base_order, base_scores = rank_order(components, base)
+    base_top = set(base_order[:top_k])
+
+    # One compact row of 0-based ranks per vector; per-task stats are
+    # then reduced column by column with C-level builtins
+    rank_rows = []
+    hits = [0] * count
+    unchanged_top = 0
+    for weights in vectors:
+        order, _ = rank_order(components, weights, rounded=False)
+        ranks = [0] * count
+        for rank, idx in enumerate(order):
+            ranks[idx] = rank
+        rank_rows.append(array('I', ranks))
+        top = order[:top_k]
+        for idx in top:
+            hits[idx] += 1
+        if set(top) == base_top:
+            unchanged_top += 1
+
+    evaluated = len(vectors)
+    base_rank = {idx: rank for rank, idx in enumerate(base_order, 1)}
+    stats = [{'base_rank': base_rank[idx], 'base_score': base_scores[idx]} for idx in range(count)]
+    for idx, column in enumerate(zip(*rank_rows)):
+        mean = sum(column) / evaluated
+        variance = sum(map(mul, column, column)) / evaluated - mean * mean
+        stats[idx].update({
+            'top_k_frequency': round(hits[idx] / evaluated, 4),
+            'mean_rank': round(mean + 1, 2),
+            'rank_variance': round(max(0.0, variance), 4),
+            'best_rank': min(column) + 1,
+            'worst_rank': max(column) + 1
+        })
+
+    return {
+        'base_order': base_order,
+        'stats': stats,
+        'weight_vectors_evaluated': evaluated,
+        'top_k_stability': round(unchanged_top / evaluated, 4) if evaluated else None
+    }
+
+
+class SensitivityPipeline(AnalysisPipeline):
+    """
+    validate -> assign_ids -> build_graph -> check_cycles -> components -> reweight -> render
+
+    Component scores are computed once per task. Each weight vector then
+    only re-combines those four numbers and sorts, instead of re-scoring
+    every task.
+    """
+
+    STAGES = ('validate', 'assign_ids', 'build_graph', 'check_cycles',
+              'components', 'reweight', 'render')
+    request_serializer_class = SensitivityRequestSerializer
+
+    def validate(self, state):
+        super().validate(state)
+        if state.response is not None:
+            return
+
+        data = state.validated_data
+        count = vector_count(data['method'], data['samples'], data['steps'])
+        max_vectors = getattr(settings, 'SENSITIVITY_MAX_WEIGHT_VECTORS', DEFAULT_MAX_WEIGHT_VECTORS)
+        if count > max_vectors:
+            field = 'steps' if data['method'] == 'grid' else 'samples'
+            state.response = Response(
+                {
+                    'error': 'Invalid request data',
+                    'details': {field: [f'At most {max_vectors} weight vectors allowed, got {count}']}
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+            return
+
+        max_evaluations = getattr(settings, 'SENSITIVITY_MAX_EVALUATIONS', DEFAULT_MAX_EVALUATIONS)
+        if count * len(state.tasks) > max_evaluations:
+            raise PayloadTooLarge(
+                f'{count} weight vectors x {len(state.tasks)} tasks exceeds '
+                f'{max_evaluations} evaluations per request'
+            )
+
+    def components(self, state):
+        for task in state.tasks:
+            try:
+                components = TaskScorer.calculate_components(
+                    task, [], state.blocking_counts, state.context
+                )
+                state.components.append(tuple(components[name] for name in COMPONENTS))
+            except Exception as e:
+                # Same fallback as scoring: keep the task with a zero score
+                logger.error(f'Error scoring task {task.get("id", "unknown")}: {str(e)}')
+                state.components.append((0, 0, 0, 0))
+
+    def reweight(self, state):
+        data = state.validated_data
+        base = TaskScorer.STRATEGY_WEIGHTS[state.strategy]
+        vectors = weight_vectors(
+            base, data['method'], data['samples'], data['steps'], data['spread'],
+            default_seed(data)
+        )
+        if not vectors:
+            # Every perturbed vector clipped to all zeros, nothing to rank
+            state.response = Response(
+                {
+                    'error': 'Invalid request data',
+                    'details': {'spread': ['Every weight vector clipped to zero; lower spread or add samples']}
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+            return
+        state.sensitivity = rank_stability(state.components, base, vectors, data['top_k'])
+
+
+def render_sensitivity(state):
+    """Per-task ranking stability for /sensitivity/, in base ranking order"""
+    data = state.validated_data
+    result = state.sensitivity
+    return Response(with_graph_report(state, {
+        'tasks': [
+            {
+                'id': state.tasks[idx]['id'],
+                'title': state.tasks[idx]['title'],
+                **result['stats'][idx]
+            }
+            for idx in result['base_order']
+        ],
+        'strategy_used': state.strategy,
+        'method': data['method'],
+        'spread': data['spread'],
+        'top_k': data['top_k'],
+        'weight_vectors_evaluated': result['weight_vectors_evaluated'],
+        'top_k_stability': result['top_k_stability'],
+        'has_circular_dependencies': state.has_circular
+    }), status=status.HTTP_200_OK)
+
+
+sensitivity_pipeline = SensitivityPipeline(
+    renderer=render_sensitivity,
+    require_tasks=True
+)
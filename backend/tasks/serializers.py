@@ -52,6 +52,20 @@ class AnalyzeRequestSerializer(serializers.Serializer):
         choices=['smart_balance', 'fastest_wins', 'high_impact', 'deadline_driven'],
         default='smart_balance'
     )
+    as_of = serializers.DateField(required=False)
+    include_graph_report = serializers.BooleanField(default=False)
+    page_size = serializers.IntegerField(min_value=1, max_value=1000, required=False)
+
+
+class SensitivityRequestSerializer(AnalyzeRequestSerializer):
+    """Request body for the what-if sensitivity endpoint"""
+    
+    top_k = serializers.IntegerField(min_value=1, default=3)
+    method = serializers.ChoiceField(choices=['random', 'grid'], default='random')
+    samples = serializers.IntegerField(min_value=1, default=200)
+    steps = serializers.IntegerField(min_value=2, default=3)
+    spread = serializers.FloatField(min_value=0, max_value=1, default=0.05)
+    seed = serializers.IntegerField(required=False)
 
 
 class ScoredTaskSerializer(serializers.Serializer):
@@ -0,0 +1,31 @@
+"""Model signal handlers for the tasks app"""
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .graph import dependency_index
+from .models import Task
+from .storage import configure_sqlite
+
+
+@receiver(connection_created)
+def tune_sqlite_connection(sender, connection, **kwargs):
+    """Apply SQLITE_PRAGMAS (WAL, busy timeout, mmap) to new connections"""
+    configure_sqlite(connection)
+
+
+@receiver(post_save, sender=Task)
+def update_dependency_index(sender, instance, **kwargs):
+    """Keep the dependency index in step with saved tasks, once committed"""
+    pk, dependencies = instance.pk, list(instance.dependencies or [])
+    version = Task.objects.version()
+    transaction.on_commit(lambda: dependency_index.task_saved(pk, dependencies, version))
+
+
+@receiver(post_delete, sender=Task)
+def remove_from_dependency_index(sender, instance, **kwargs):
+    """Drop deleted tasks from the dependency index, once committed"""
+    pk = instance.pk
+    version = Task.objects.version()
+    transaction.on_commit(lambda: dependency_index.task_deleted(pk, version))
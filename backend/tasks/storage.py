@@ -0,0 +1,109 @@
+"""SQLite tuning and batched task writes for the production storage mode"""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_MAX_WAIT_MS = 2
+
+
+def configure_sqlite(connection):
+    """Apply `SQLITE_PRAGMAS` to a freshly opened SQLite connection"""
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', None)
+    if connection.vendor != 'sqlite' or not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+class TaskWriteQueue:
+    """
+    Single writer thread that groups queued writes into one transaction.
+
+    Each write runs in its own savepoint, so a failing write only fails
+    its own caller. Callers block until their write has committed.
+    """
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE, max_wait_ms=DEFAULT_MAX_WAIT_MS):
+        self.batch_size = batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.pending = queue.Queue()
+        self.lock = threading.Lock()
+        self.thread = None
+        self.batches = 0
+        self.writes = 0
+
+    def submit(self, func, *args, **kwargs):
+        """Queue `func(*args, **kwargs)` and wait for its committed result"""
+        future = Future()
+        self.pending.put((future, func, args, kwargs))
+        self._ensure_started()
+        return future.result()
+
+    def _ensure_started(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(
+                    target=self._run, name='task-write-queue', daemon=True
+                )
+                self.thread.start()
+
+    def _next_batch(self):
+        batch = [self.pending.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self.pending.get(timeout=max(0, remaining)))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            close_old_connections()
+            results = []
+            try:
+                with transaction.atomic():
+                    for future, func, args, kwargs in batch:
+                        try:
+                            with transaction.atomic():
+                                results.append((future, func(*args, **kwargs), None))
+                        except Exception as e:
+                            results.append((future, None, e))
+            except Exception as e:
+                logger.error(f'Write batch of {len(batch)} failed to commit: {str(e)}')
+                for future, func, args, kwargs in batch:
+                    future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.writes += len(batch)
+            for future, result, error in results:
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
+
+
+write_queue = TaskWriteQueue(
+    batch_size=getattr(settings, 'TASK_WRITE_BATCH_SIZE', DEFAULT_BATCH_SIZE),
+    max_wait_ms=getattr(settings, 'TASK_WRITE_MAX_WAIT_MS', DEFAULT_MAX_WAIT_MS)
+)
+
+
+def run_write(func, *args, **kwargs):
+    """Run a task write, through the batching queue when `TASK_WRITE_QUEUE` is on"""
+    if getattr(settings, 'TASK_WRITE_QUEUE', False):
+        return write_queue.submit(func, *args, **kwargs)
+    return func(*args, **kwargs)
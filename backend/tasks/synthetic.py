@@ -0,0 +1,25 @@
+"""Synthetic task generator for load and benchmark runs"""
+import random
+from datetime import date, timedelta
+from typing import List, Dict
+
+
+def generate_tasks(count: int, seed: int = None, dependency_ratio: float = 0.3,
+                   as_of: date = None) -> List[Dict]:
+    """Build `count` analyze-ready tasks with a realistic spread of fields"""
+    rng = random.Random(seed)
+    today = as_of or date.today()
+    tasks = []
+    for idx in range(count):
+        dependencies = []
+        if idx and rng.random() < dependency_ratio:
+            dependencies = [f'task_{rng.randrange(idx)}']
+        tasks.append({
+            'id': f'task_{idx}',
+            'title': f'Synthetic task {idx}',
+            'due_date': (today + timedelta(days=rng.randint(-7, 45))).isoformat(),
+            'estimated_hours': rng.choice([0.5, 1, 2, 3, 5, 8, 13]),
+            'importance': rng.randint(1, 10),
+            'dependencies': dependencies,
+        })
+    return tasks
@@ -1,7 +1,34 @@
 """Comprehensive unit tests for scoring algorithm"""
-from django.test import TestCase
+import io
+import json
+import os
+import socket
+import tempfile
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
 from datetime import date, timedelta
-from .scoring import TaskScorer, DependencyAnalyzer
+from unittest import mock
+from rest_framework.exceptions import ParseError
+from .exceptions import PayloadTooLarge
+from .graph import dependency_index
+from .management.commands.loadtest import LoadClient, percentile
+from .memory import trace_peak
+from .models import Task, TaskQuerySet
+from .parsers import AnalyzeRequestParser, StreamingAnalyzeParser
+from .pipeline import AnalysisPipeline
+from .results import ResultStore
+from .scoring import ScoringContext, TaskScorer, DependencyAnalyzer
+from .sensitivity import rank_stability, weight_vectors
+from .serializers import TaskInputSerializer
+from .storage import TaskWriteQueue
+from .synthetic import generate_tasks
+
+
+def post_json(client, path, body, **extra):
+    """POST `body` as JSON to `path`"""
+    return client.post(path, data=json.dumps(body), content_type='application/json', **extra)
 
 
 class TaskScorerTests(TestCase):
@@ -61,6 +88,21 @@ class TaskScorerTests(TestCase):
         score = TaskScorer.calculate_dependency_score('task_2', tasks)
         self.assertEqual(score, 0)
     
+    def test_blocking_counts_match_dependency_score(self):
+        """Precomputed blocking counts give the same dependency score"""
+        tasks = [
+            {'id': 'task_1', 'dependencies': []},
+            {'id': 'task_2', 'dependencies': ['task_1', 'task_1']},
+            {'id': 'task_3', 'dependencies': ['task_1', 'task_2']},
+        ]
+        counts = TaskScorer.count_blocking(tasks)
+        
+        for task in tasks:
+            self.assertEqual(
+                counts.get(task['id'], 0) * 20,
+                TaskScorer.calculate_dependency_score(task['id'], tasks)
+            )
+    
     def test_complete_scoring(self):
         """Full priority score calculation"""
         task = {
@@ -144,6 +186,46 @@ class DependencyTests(TestCase):
         """Empty list doesn't cause errors"""
         has_circular = DependencyAnalyzer.detect_circular_dependencies([])
         self.assertFalse(has_circular)
+    
+    def test_graph_report(self):
+        """One pass reports every graph problem"""
+        tasks = [
+            {'id': 'a', 'dependencies': []},
+            {'id': 'b', 'dependencies': ['a', 'ghost']},
+            {'id': 'c', 'dependencies': ['b', 'a']},
+            {'id': 'd', 'dependencies': ['d']},
+            {'id': 'e', 'dependencies': []},
+            {'id': 'e', 'dependencies': []},
+        ]
+        
+        graph = DependencyAnalyzer.analyze_graph(tasks)
+        report = graph['report']
+        
+        self.assertEqual(report['dangling_dependencies'], [{'task_id': 'b', 'missing': ['ghost']}])
+        self.assertEqual(report['self_loops'], ['d'])
+        self.assertEqual(report['duplicate_ids'], ['e'])
+        self.assertEqual(report['isolated_tasks'], ['e'])
+        self.assertEqual(report['max_chain_depth'], 3)
+        self.assertEqual(report['fan_in_distribution'], {'0': 2, '1': 2, '2': 1})
+        self.assertEqual(graph['blocking_counts'], TaskScorer.count_blocking(tasks))
+        self.assertTrue(graph['has_cycle'])
+    
+    def test_graph_report_cycle_matches_dfs(self):
+        """Kahn's leftover agrees with the DFS cycle check"""
+        cases = [
+            [{'id': '1', 'dependencies': ['2']}, {'id': '2', 'dependencies': ['3']},
+             {'id': '3', 'dependencies': ['1']}, {'id': '4', 'dependencies': ['1']}],
+            [{'id': '1', 'dependencies': ['2', 'x']}, {'id': '2', 'dependencies': []}],
+            # Cycle members that share an already-processed dependency
+            [{'id': 'a', 'dependencies': []}, {'id': 'b', 'dependencies': ['a', 'c']},
+             {'id': 'c', 'dependencies': ['a', 'b']}],
+        ]
+        for tasks in cases:
+            self.assertEqual(
+                DependencyAnalyzer.analyze_graph(tasks)['has_cycle'],
+                DependencyAnalyzer.detect_circular_dependencies(tasks)
+            )
+        self.assertEqual(DependencyAnalyzer.analyze_graph(cases[2])['report']['max_chain_depth'], 1)
 
 
 class ExplanationTests(TestCase):
@@ -195,4 +277,657 @@ class ExplanationTests(TestCase):
         scoring = TaskScorer.calculate_priority_score(task, [task])
         explanation = TaskScorer.generate_explanation(task, scoring, 'smart_balance')
         
-        self.assertIn('Quick win', explanation)
\ No newline at end of file
+        self.assertIn('Quick win', explanation)
+
+
+class StreamingParserTests(TestCase):
+    """Test incremental parsing of analyze request bodies"""
+    
+    def make_task(self, idx, **overrides):
+        task = {
+            'id': f'task_{idx}',
+            'title': f'Task {idx}',
+            'due_date': date.today().isoformat(),
+            'estimated_hours': 2,
+            'importance': 5,
+            'dependencies': []
+        }
+        task.update(overrides)
+        return task
+    
+    def parse(self, body):
+        parser = StreamingAnalyzeParser()
+        parser.chunk_size = 7  # Force values to straddle chunk boundaries
+        return parser.parse(io.BytesIO(body.encode('utf-8')))
+    
+    def test_parses_tasks_across_chunks(self):
+        """Tasks split over many small reads are decoded and validated"""
+        body = json.dumps({
+            'strategy': 'fastest_wins',
+            'tasks': [self.make_task(i) for i in range(5)]
+        })
+        data = self.parse(body)
+        
+        self.assertEqual(data['strategy'], 'fastest_wins')
+        self.assertEqual(len(data['tasks']), 5)
+        self.assertEqual(data['tasks'][0]['due_date'], date.today())
+    
+    def test_invalid_task_reports_index(self):
+        """Validation errors are keyed by task position"""
+        body = json.dumps({'tasks': [self.make_task(0), self.make_task(1, importance=11)]})
+        
+        with self.assertRaises(ParseError) as ctx:
+            self.parse(body)
+        self.assertIn(1, ctx.exception.detail['details']['tasks'])
+    
+    def test_malformed_json_rejected(self):
+        """Truncated bodies raise a parse error"""
+        with self.assertRaises(ParseError):
+            self.parse('{"tasks": [{"title": "x"')
+    
+    @override_settings(ANALYZE_MAX_ITEM_BYTES=200)
+    def test_oversized_value_stops_reading(self):
+        """A value larger than the item cap fails without buffering the rest"""
+        tasks = [self.make_task(0, title='x' * 1000)] + [self.make_task(i) for i in range(1, 200)]
+        stream = io.BytesIO(json.dumps({'tasks': tasks}).encode('utf-8'))
+        
+        parser = StreamingAnalyzeParser()
+        parser.chunk_size = 64
+        with self.assertRaises(ParseError):
+            parser.parse(stream)
+        self.assertLess(stream.tell(), len(stream.getvalue()) // 2)
+    
+    @override_settings(ANALYZE_MAX_TASKS=3)
+    def test_task_count_limit(self):
+        """Requests over the task limit are rejected with 413"""
+        body = json.dumps({'tasks': [self.make_task(i) for i in range(4)]})
+        with self.assertRaises(PayloadTooLarge):
+            self.parse(body)
+    
+    @override_settings(ANALYZE_MAX_BODY_BYTES=100)
+    def test_body_size_limit_returns_413(self):
+        """Oversized bodies are rejected before scoring"""
+        response = post_json(
+            self.client, '/api/tasks/analyze/', {'tasks': [self.make_task(i) for i in range(5)]}
+        )
+        self.assertEqual(response.status_code, 413)
+    
+    def test_analyze_endpoint_uses_streamed_tasks(self):
+        """End-to-end analysis through the streaming parser"""
+        response = post_json(self.client, '/api/tasks/analyze/', {
+            'tasks': [self.make_task(0), self.make_task(1, dependencies=['task_0'])]
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['tasks'][0]['id'], 'task_0')
+
+
+class AnalyzeFileCommandTests(TestCase):
+    """Test the offline analyze_file management command"""
+    
+    def write_file(self, suffix, content):
+        fd, path = tempfile.mkstemp(suffix=suffix)
+        with os.fdopen(fd, 'w') as handle:
+            handle.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+    
+    def test_ranks_jsonl_input(self):
+        """JSONL rows are validated, scored and written highest first"""
+        today = date.today().isoformat()
+        rows = [
+            {'id': 'a', 'title': 'A', 'due_date': today, 'estimated_hours': 8, 'importance': 2},
+            {'id': 'b', 'title': 'B', 'due_date': today, 'estimated_hours': 1, 'importance': 9},
+            {'title': 'Broken', 'due_date': 'not-a-date', 'estimated_hours': 1, 'importance': 5},
+        ]
+        path = self.write_file('.jsonl', '\n'.join(json.dumps(r) for r in rows))
+        out, err = io.StringIO(), io.StringIO()
+        
+        call_command('analyze_file', path, stdout=out, stderr=err)
+        
+        results = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([r['id'] for r in results], ['b', 'a'])
+        self.assertIn('1 skipped', err.getvalue())
+        self.assertIn('tasks/s', err.getvalue())
+    
+    def test_csv_top_k_output(self):
+        """CSV input with comma-separated dependencies and top-k CSV output"""
+        today = date.today().isoformat()
+        path = self.write_file('.csv', (
+            'id,title,due_date,estimated_hours,importance,dependencies\n'
+            f'a,A,{today},3,5,\n'
+            f'b,B,{today},3,5,"a"\n'
+            f'c,C,{today},3,5,"a,b"\n'
+        ))
+        out = io.StringIO()
+        
+        call_command('analyze_file', path, '--format', 'csv', '--top', '1',
+                     stdout=out, stderr=io.StringIO())
+        
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[1].startswith('1,a,'))
+
+
+class DependencyIndexTests(TestCase):
+    """Test ancestor/descendant queries over stored tasks"""
+    
+    def create(self, title, dependencies=()):
+        return Task.objects.create(
+            title=title,
+            due_date=date.today(),
+            estimated_hours=1,
+            importance=5,
+            dependencies=list(dependencies)
+        )
+    
+    def setUp(self):
+        # a <- b <- c, plus a dangling reference from c
+        self.a = self.create('A')
+        self.b = self.create('B', [self.a.pk])
+        self.c = self.create('C', [str(self.b.pk), 99999])
+    
+    def test_ancestors_are_transitive(self):
+        """Everything that must finish first, nearest first"""
+        self.assertEqual(dependency_index.ancestors(self.c.pk), [self.b.pk, self.a.pk])
+    
+    def test_descendants_are_transitive(self):
+        """Everything a task ultimately blocks"""
+        self.assertEqual(dependency_index.descendants(self.a.pk), [self.b.pk, self.c.pk])
+    
+    def test_index_follows_saves_and_deletes(self):
+        """Edits and deletes update the index without stale edges"""
+        dependency_index.ancestors(self.c.pk)
+        
+        self.b.dependencies = []
+        self.b.save()
+        self.assertEqual(dependency_index.ancestors(self.c.pk), [self.b.pk])
+        
+        self.b.delete()
+        self.assertEqual(dependency_index.descendants(self.a.pk), [])
+    
+    def test_local_writes_update_index_incrementally(self):
+        """A committed local save advances the index without a rebuild"""
+        dependency_index.ancestors(self.c.pk)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.b.dependencies = []
+            self.b.save()
+        
+        self.assertEqual(dependency_index.version, Task.objects.version())
+        self.assertEqual(dependency_index.ancestors(self.c.pk), [self.b.pk])
+    
+    def test_unseen_writes_force_rebuild(self):
+        """A write from another process is not masked by a later local save"""
+        dependency_index.ancestors(self.c.pk)
+        
+        # Queryset updates send no signals, like a write from another process
+        Task.objects.filter(pk=self.b.pk).update(dependencies=[])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create('Unrelated')
+        
+        self.assertIsNone(dependency_index.version)
+        self.assertEqual(dependency_index.ancestors(self.c.pk), [self.b.pk])
+    
+    def test_cycles_terminate(self):
+        """Cyclic dependencies do not loop forever"""
+        self.a.dependencies = [self.c.pk]
+        self.a.save()
+        self.assertEqual(
+            sorted(dependency_index.descendants(self.a.pk)),
+            sorted([self.b.pk, self.c.pk])
+        )
+    
+    def test_endpoints(self):
+        """Ancestors/descendants endpoints return serialized tasks"""
+        response = self.client.get(f'/api/tasks/{self.c.pk}/ancestors/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([t['title'] for t in response.json()['ancestors']], ['B', 'A'])
+        
+        response = self.client.get('/api/tasks/99999/descendants/')
+        self.assertEqual(response.status_code, 404)
+
+
+class TaskVersionTests(TransactionTestCase):
+    """Test the table change stamp behind the index and list ETag"""
+    
+    def create(self, title):
+        return Task.objects.create(
+            title=title, due_date=date.today(), estimated_hours=1, importance=5
+        )
+    
+    def test_stamp_survives_flush(self):
+        """A flushed counter row is recreated and never repeats an old stamp"""
+        before = Task.objects.version()
+        call_command('flush', interactive=False, verbosity=0)
+        task = self.create('After flush')
+        
+        after = Task.objects.version()
+        self.assertIsNotNone(after)
+        self.assertNotEqual(after, before)
+        
+        Task.objects.filter(pk=task.pk).update(importance=9)
+        self.assertNotEqual(Task.objects.version(), after)
+        self.assertEqual(dependency_index.ancestors(task.pk), [])
+        self.assertEqual(dependency_index.version, Task.objects.version())
+    
+    def test_content_version_tracks_queryset_updates(self):
+        """The trigger-less fallback stamp sees writes that skip signals"""
+        task = self.create('Stored')
+        before = Task.objects.content_version()
+        Task.objects.filter(pk=task.pk).update(importance=9)
+        self.assertNotEqual(Task.objects.content_version(), before)
+
+
+class ConditionalRequestTests(TestCase):
+    """Test ETag / If-None-Match handling"""
+    
+    def setUp(self):
+        self.task = Task.objects.create(
+            title='Stored', due_date=date.today(), estimated_hours=1, importance=5
+        )
+    
+    def test_list_returns_304_until_table_changes(self):
+        """List ETag tracks the table change stamp"""
+        first = self.client.get('/api/tasks/')
+        etag = first['ETag']
+        
+        cached = self.client.get('/api/tasks/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached.content, b'')
+        
+        self.task.importance = 9
+        self.task.save()
+        changed = self.client.get('/api/tasks/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], etag)
+    
+    def test_list_without_version_is_untagged(self):
+        """An unknown table version neither sends nor honours an ETag"""
+        etag = self.client.get('/api/tasks/')['ETag']
+        with mock.patch.object(TaskQuerySet, 'version', return_value=None):
+            response = self.client.get('/api/tasks/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('ETag', response)
+    
+    def test_detail_etag(self):
+        """Task detail honours If-None-Match"""
+        url = f'/api/tasks/{self.task.pk}/'
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        
+        # Queryset updates leave updated_at alone but still change the tag
+        Task.objects.filter(pk=self.task.pk).update(importance=9)
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(changed.json()['importance'], 9)
+    
+    def test_analysis_etag_depends_on_body(self):
+        """Identical analysis bodies get 304, different ones are rescored"""
+        task = {
+            'title': 'T', 'due_date': date.today().isoformat(),
+            'estimated_hours': 1, 'importance': 5
+        }
+        body = {'tasks': [task]}
+        etag = post_json(self.client, '/api/tasks/suggest/', body)['ETag']
+        
+        repeat = post_json(self.client, '/api/tasks/suggest/', body, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(repeat.status_code, 304)
+        
+        other = {'tasks': [task], 'strategy': 'fastest_wins'}
+        changed = post_json(self.client, '/api/tasks/suggest/', other, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        
+        # The same body on a different endpoint gets its own tag
+        analyzed = post_json(self.client, '/api/tasks/analyze/', body, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(analyzed.status_code, 200)
+
+
+class ScoringContextTests(TestCase):
+    """Test request-scoped scoring context"""
+    
+    def test_as_of_pins_today(self):
+        """Scores are computed relative to the context date"""
+        context = ScoringContext(date(2030, 1, 10))
+        
+        self.assertEqual(context.days_until('2030-01-05'), -5)
+        self.assertEqual(TaskScorer.calculate_urgency_score('2030-01-05', context), 125)
+        self.assertEqual(TaskScorer.calculate_urgency_score(date(2030, 1, 11), context), 90)
+    
+    def test_urgency_memoized_by_offset(self):
+        """Repeated offsets reuse the first computed urgency"""
+        context = ScoringContext(date(2030, 1, 10))
+        context.urgency(3)
+        context._urgency_by_offset[3] = -1
+        self.assertEqual(context.urgency(3), -1)
+    
+    def test_as_of_api_parameter(self):
+        """The analyze endpoint accepts an as_of date"""
+        body = {
+            'as_of': '2030-01-10',
+            'tasks': [{
+                'title': 'T', 'due_date': '2030-01-08',
+                'estimated_hours': 1, 'importance': 5
+            }]
+        }
+        response = post_json(self.client, '/api/tasks/analyze/', body)
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['tasks'][0]['breakdown']['days_until_due'], -2)
+        
+        bad = post_json(self.client, '/api/tasks/analyze/', {**body, 'as_of': 'soon'})
+        self.assertEqual(bad.status_code, 400)
+        self.assertIn('as_of', bad.json()['details'])
+
+
+class LoadTestHelperTests(TestCase):
+    """Test load generator helpers"""
+    
+    def test_percentile_nearest_rank(self):
+        """p50/p99 use nearest-rank on sorted samples"""
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([7], 95), 7)
+    
+    def test_transport_errors_close_the_connection(self):
+        """A request that times out closes its socket in both connection modes"""
+        server = socket.socket()
+        server.bind(('127.0.0.1', 0))
+        server.listen()
+        self.addCleanup(server.close)
+        
+        for keep_alive in (False, True):
+            client = LoadClient(f'http://127.0.0.1:{server.getsockname()[1]}', 0.1, keep_alive)
+            conn = client.connection()
+            self.assertEqual(client.request('GET', '/'), (0, None))
+            self.assertIsNone(conn.sock)
+            self.assertIsNone(client.local.conn)
+    
+    def test_synthetic_tasks_are_valid_and_repeatable(self):
+        """Generated tasks pass input validation and are seed-stable"""
+        tasks = generate_tasks(20, seed=3)
+        
+        self.assertEqual(tasks, generate_tasks(20, seed=3))
+        serializer = TaskInputSerializer(data=tasks, many=True)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+
+
+class MemoryBudgetTests(TestCase):
+    """Test memory budget downgrades and peak reporting"""
+    
+    def analyze(self, count=5):
+        return post_json(self.client, '/api/tasks/analyze/', {'tasks': generate_tasks(count, seed=1)})
+    
+    def test_within_budget_is_full(self):
+        """Small requests keep the full response shape"""
+        data = self.analyze().json()
+        self.assertEqual(data['response_mode'], 'full')
+        self.assertIn('breakdown', data['tasks'][0])
+    
+    @override_settings(ANALYZE_MEMORY_BUDGET_BYTES=1000, ANALYZE_OVER_BUDGET='project')
+    def test_over_budget_projects(self):
+        """Over budget, rows are reduced to id/title/score/explanation"""
+        data = self.analyze().json()
+        self.assertEqual(data['response_mode'], 'project')
+        self.assertEqual(
+            set(data['tasks'][0]),
+            {'id', 'title', 'priority_score', 'explanation'}
+        )
+    
+    @override_settings(ANALYZE_MEMORY_BUDGET_BYTES=1000, ANALYZE_OVER_BUDGET='stream')
+    def test_over_budget_streams(self):
+        """Streamed responses render to the same ranking as full ones"""
+        response = self.analyze()
+        self.assertTrue(response.streaming)
+        data = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(data['response_mode'], 'stream')
+        self.assertEqual(len(data['tasks']), 5)
+        scores = [t['priority_score'] for t in data['tasks']]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+    
+    @override_settings(ANALYZE_MEMORY_BUDGET_BYTES=1000, ANALYZE_OVER_BUDGET='reject')
+    def test_over_budget_rejects(self):
+        """Reject mode answers 413 before scoring"""
+        self.assertEqual(self.analyze().status_code, 413)
+    
+    @override_settings(ANALYZE_MEMORY_BUDGET_BYTES=1000, ANALYZE_BYTES_PER_TASK=500,
+                       ANALYZE_OVER_BUDGET='reject')
+    def test_reject_stops_parsing_at_budget(self):
+        """The parser gives up at the first task past the budget"""
+        tasks = generate_tasks(200, seed=1)
+        stream = io.BytesIO(json.dumps({'tasks': tasks}).encode('utf-8'))
+        parser = AnalyzeRequestParser()
+        parser.chunk_size = 256
+        
+        with self.assertRaises(PayloadTooLarge):
+            parser.parse(stream)
+        self.assertLess(stream.tell(), len(stream.getvalue()) // 10)
+    
+    @override_settings(ANALYZE_TRACE_MEMORY=True)
+    def test_peak_bytes_headers(self):
+        """Peak allocation per task is exported as response headers"""
+        response = self.analyze(count=20)
+        self.assertGreater(int(response['X-Analysis-Peak-Bytes']), 0)
+        self.assertGreater(int(response['X-Analysis-Peak-Bytes-Per-Task']), 0)
+    
+    def test_concurrent_traces_do_not_clobber_each_other(self):
+        """Overlapping traced blocks each see their own allocation"""
+        def traced(_):
+            with trace_peak() as stats:
+                block = bytearray(1024 * 1024)
+                time.sleep(0.01)
+                del block
+            return stats['peak']
+        
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            peaks = list(pool.map(traced, range(4)))
+        for peak in peaks:
+            self.assertGreaterEqual(peak, 1024 * 1024)
+
+
+class AnalysisPipelineTests(TestCase):
+    """Test the shared analyze/suggest pipeline"""
+    
+    def setUp(self):
+        self.tasks = generate_tasks(12, seed=7)
+        self.tasks[0]['dependencies'] = ['task_5']
+        self.tasks[5]['dependencies'] = ['task_0']
+    
+    def post(self, endpoint, **options):
+        return post_json(self.client, f'/api/tasks/{endpoint}/', {'tasks': self.tasks, **options})
+    
+    def test_suggest_matches_top_of_analysis(self):
+        """Both endpoints rank identically and both check cycles"""
+        analyzed = self.post('analyze').json()
+        suggested = self.post('suggest').json()
+        
+        self.assertEqual(suggested['suggested_tasks'], analyzed['tasks'][:3])
+        self.assertTrue(suggested['has_circular_dependencies'])
+        self.assertTrue(analyzed['has_circular_dependencies'])
+    
+    def test_stage_hooks_and_run_tasks(self):
+        """Batch callers run the middle stages with timing hooks"""
+        seen = []
+        pipeline = AnalysisPipeline(top_k=2, hooks=[lambda name, elapsed, state: seen.append(name)])
+        
+        state = pipeline.run_tasks([dict(t) for t in self.tasks], 'high_impact')
+        
+        self.assertEqual(seen, ['assign_ids', 'build_graph', 'check_cycles', 'score', 'rank'])
+        self.assertEqual(len(state.ranked), 2)
+        self.assertGreaterEqual(state.ranked[0][0], state.ranked[1][0])
+    
+    def test_server_timing_header(self):
+        """Stage timings are exposed on the response"""
+        self.assertIn('score;dur=', self.post('suggest')['Server-Timing'])
+    
+    def test_graph_report_is_opt_in(self):
+        """/analyze/ only includes the graph report when asked"""
+        self.assertNotIn('graph_report', self.post('analyze').json())
+        
+        data = self.post('analyze', include_graph_report=True).json()
+        self.assertTrue(data['has_circular_dependencies'])
+        self.assertEqual(data['graph_report']['task_count'], len(self.tasks))
+
+
+class SensitivityTests(TestCase):
+    """Test what-if re-weighting of cached component scores"""
+    
+    def setUp(self):
+        self.tasks = generate_tasks(30, seed=11)
+    
+    def post(self, **options):
+        return post_json(self.client, '/api/tasks/sensitivity/', {'tasks': self.tasks, **options})
+    
+    def test_zero_spread_is_perfectly_stable(self):
+        """Unperturbed weights reproduce the base ranking every time"""
+        base = TaskScorer.STRATEGY_WEIGHTS['high_impact']
+        components = [(50, 10 * i, 40, 0) for i in range(1, 6)]
+        
+        result = rank_stability(components, base, weight_vectors(base, samples=5, spread=0), 2)
+        
+        self.assertEqual(result['base_order'], [4, 3, 2, 1, 0])
+        self.assertEqual(result['top_k_stability'], 1.0)
+        self.assertEqual(result['stats'][4]['top_k_frequency'], 1.0)
+        self.assertEqual(result['stats'][0]['top_k_frequency'], 0.0)
+        self.assertEqual(result['stats'][2]['rank_variance'], 0.0)
+    
+    def test_base_ranking_matches_analysis(self):
+        """Base ranks and scores agree with /analyze/"""
+        data = self.post(method='grid', steps=3, spread=0.1, top_k=5).json()
+        analyzed = post_json(self.client, '/api/tasks/analyze/', {'tasks': self.tasks}).json()
+        
+        self.assertEqual(data['weight_vectors_evaluated'], 81)
+        self.assertEqual(
+            [(t['id'], t['base_score']) for t in data['tasks']],
+            [(t['id'], t['priority_score']) for t in analyzed['tasks']]
+        )
+        frequencies = sum(t['top_k_frequency'] for t in data['tasks'])
+        self.assertAlmostEqual(frequencies, 5, places=2)
+    
+    def test_unseeded_runs_match_their_etag(self):
+        """Without a seed, the same body still yields the same result"""
+        first = self.post(samples=50, spread=0.2)
+        second = self.post(samples=50, spread=0.2)
+        self.assertEqual(first.json(), second.json())
+        self.assertEqual(first['ETag'], second['ETag'])
+        
+        cached = post_json(
+            self.client, '/api/tasks/sensitivity/', {'tasks': self.tasks, 'samples': 50, 'spread': 0.2},
+            HTTP_IF_NONE_MATCH=first['ETag']
+        )
+        self.assertEqual(cached.status_code, 304)
+    
+    def test_limits(self):
+        """Too many vectors is a 400, too much work a 413"""
+        self.assertEqual(self.post(samples=5000).status_code, 400)
+        # Seed 4 draws a single vector that clips to all zeros
+        clipped = self.post(samples=1, spread=1.0, seed=4, strategy='smart_balance')
+        self.assertEqual(clipped.status_code, 400)
+        self.assertIn('spread', clipped.json()['details'])
+        with override_settings(SENSITIVITY_MAX_EVALUATIONS=100):
+            self.assertEqual(self.post(samples=10).status_code, 413)
+
+
+class ResultCursorTests(TestCase):
+    """Test paged analysis results behind a server-side cursor"""
+    
+    def test_pages_concatenate_to_full_ranking(self):
+        """Following cursors yields exactly the unpaged ranking"""
+        tasks = generate_tasks(23, seed=5)
+        page = post_json(self.client, '/api/tasks/analyze/', {'tasks': tasks, 'page_size': 10}).json()
+        self.assertEqual(page['total_tasks'], 23)
+        ids = [t['id'] for t in page['tasks']]
+        while page['next_cursor']:
+            page = self.client.get('/api/tasks/analyze/page/', {'cursor': page['next_cursor']}).json()
+            ids.extend(t['id'] for t in page['tasks'])
+        
+        full = post_json(self.client, '/api/tasks/analyze/', {'tasks': tasks}).json()
+        self.assertEqual(ids, [t['id'] for t in full['tasks']])
+    
+    def test_store_evicts_by_ttl_and_bounds(self):
+        """Entries expire after their TTL and the oldest go first when full"""
+        now = [0.0]
+        store = ResultStore(ttl=10, max_entries=2, max_tasks=5, clock=lambda: now[0])
+        
+        first = store.put([1, 2], {}, 1)
+        second = store.put([3], {}, 1)
+        now[0] = 5
+        store.get(first)
+        third = store.put([4], {}, 1)
+        self.assertIsNone(store.get(second))
+        
+        store.put([5, 6, 7], {}, 1)
+        self.assertIsNone(store.get(first))
+        self.assertIsNotNone(store.get(third))
+        
+        now[0] = 100
+        self.assertIsNone(store.get(third))
+        self.assertEqual(store.task_count, 0)
+    
+    @override_settings(ANALYZE_RESULT_MAX_TASKS=None, ANALYZE_MEMORY_BUDGET_BYTES=1000,
+                       ANALYZE_BYTES_PER_TASK=250)
+    def test_task_cap_defaults_to_memory_budget(self):
+        """Without an explicit cap the store holds what fits the budget"""
+        store = ResultStore()
+        first = store.put([1, 2, 3], {}, 1)
+        store.put([4, 5], {}, 1)
+        self.assertIsNone(store.get(first))
+        self.assertEqual(store.task_count, 2)
+    
+    def test_unknown_cursor(self):
+        """Expired cursors are a 404, malformed ones a 400"""
+        self.assertEqual(self.client.get('/api/tasks/analyze/page/', {'cursor': 'gone.10'}).status_code, 404)
+        self.assertEqual(self.client.get('/api/tasks/analyze/page/', {'cursor': 'junk'}).status_code, 400)
+
+
+class TaskWriteQueueTests(TransactionTestCase):
+    """Test batched writes for the production storage mode"""
+    
+    def create(self, title):
+        return Task.objects.create(
+            title=title, due_date=date.today(), estimated_hours=1, importance=5
+        )
+    
+    def test_writes_commit_and_failures_stay_isolated(self):
+        """Queued writes share one batch and a failing write raises for its caller only"""
+        write_queue = TaskWriteQueue(batch_size=8, max_wait_ms=20)
+        
+        # Queue everything before the writer starts so the batch is known
+        futures = []
+        for title in ['A', 'B', None, 'C', 'D', 'E']:
+            future = Future()
+            write_queue.pending.put((future, self.create, (title,), {}))
+            futures.append(future)
+        write_queue._ensure_started()
+        
+        self.assertIsInstance(futures[2].exception(timeout=5), Exception)
+        for future in futures[:2] + futures[3:]:
+            self.assertIsInstance(future.result(timeout=5), Task)
+        self.assertEqual(
+            sorted(Task.objects.values_list('title', flat=True)), ['A', 'B', 'C', 'D', 'E']
+        )
+        self.assertEqual((write_queue.batches, write_queue.writes), (1, 6))
+    
+    @override_settings(TASK_WRITE_QUEUE=True)
+    def test_create_endpoint_goes_through_queue(self):
+        """API writes return normally when queued"""
+        response = post_json(self.client, '/api/tasks/create/', {
+            'title': 'Queued', 'due_date': '2030-01-01', 'estimated_hours': 2,
+            'importance': 5, 'dependencies': []
+        })
+        
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Task.objects.filter(title='Queued').exists())
+    
+    def test_production_mode_has_no_lock_errors(self):
+        """Concurrent writers on a file-backed database never see a lock error"""
+        out = io.StringIO()
+        call_command(
+            'benchmark_writes', '--modes', 'production', '--processes', '2',
+            '--threads', '4', '--writes', '25', stdout=out
+        )
+        report = json.loads(out.getvalue())['production']
+        
+        self.assertEqual(report['lock_errors'], 0)
+        self.assertEqual(report['other_errors'], 0)
+        self.assertEqual(report['writes'], 2 * 4 * 25)
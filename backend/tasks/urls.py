@@ -7,10 +7,16 @@ app_name = 'tasks'
 urlpatterns = [
     # Analysis endpoints
     path('analyze/', views.analyze_tasks, name='analyze_tasks'),
+    path('analyze/page/', views.analysis_page, name='analysis_page'),
     path('suggest/', views.suggest_tasks, name='suggest_tasks'),
+    path('sensitivity/', views.sensitivity_analysis, name='sensitivity_analysis'),
     
     # CRUD endpoints
     path('', views.list_tasks, name='list_tasks'),
     path('create/', views.create_task, name='create_task'),
     path('<int:pk>/', views.task_detail, name='task_detail'),
+    
+    # Dependency graph queries
+    path('<int:pk>/ancestors/', views.task_ancestors, name='task_ancestors'),
+    path('<int:pk>/descendants/', views.task_descendants, name='task_descendants'),
 ]
\ No newline at end of file
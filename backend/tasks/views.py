@@ -1,150 +1,95 @@
 """API views for task analysis"""
-from rest_framework.decorators import api_view
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.decorators import api_view, parser_classes
 from rest_framework.response import Response
 from rest_framework import status
 
-from .serializers import (
-    AnalyzeRequestSerializer,
-    TaskSerializer
-)
-from .scoring import TaskScorer, DependencyAnalyzer
+from .parsers import AnalyzeRequestParser, SensitivityRequestParser, StreamingAnalyzeParser
+from .pipeline import analyze_pipeline, page_body, suggest_pipeline
+from .results import parse_cursor, result_store
+from .serializers import TaskSerializer
+from .etags import etag_matches, make_etag, not_modified
+from .graph import dependency_index
+from .storage import run_write
 from .models import Task
 
 
 @api_view(['POST'])
+@parser_classes([AnalyzeRequestParser])
 def analyze_tasks(request):
     """
     POST /api/tasks/analyze/
     
     Analyze and prioritize tasks based on strategy
     """
+    return analyze_pipeline.run(request)
+
+
+@api_view(['GET'])
+def analysis_page(request):
+    """
+    GET /api/tasks/analyze/page/?cursor=...
+    
+    Next page of an analysis that was run with `page_size`
+    """
     try:
-        serializer = AnalyzeRequestSerializer(data=request.data)
-        if not serializer.is_valid():
-            return Response(
-                {'error': 'Invalid request data', 'details': serializer.errors},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        validated_data = serializer.validated_data
-        tasks = validated_data['tasks']
-        strategy = validated_data.get('strategy', 'smart_balance')
-        
-        if not tasks or len(tasks) == 0:
-            return Response(
-                {'error': 'No tasks provided for analysis'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        for idx, task in enumerate(tasks):
-            if 'id' not in task or task['id'] is None:
-                task['id'] = f'task_{idx}'
-        
-        has_circular = DependencyAnalyzer.detect_circular_dependencies(tasks)
-        scored_tasks = []
-        for task in tasks:
-            try:
-                scoring = TaskScorer.calculate_priority_score(task, tasks, strategy)
-                explanation = TaskScorer.generate_explanation(task, scoring, strategy)
-                
-                scored_task = {
-                    **task,
-                    'priority_score': scoring['score'],
-                    'breakdown': scoring['breakdown'],
-                    'explanation': explanation
-                }
-                scored_tasks.append(scored_task)
-            except Exception as e:
-                import logging
-                logger = logging.getLogger(__name__)
-                logger.error(f'Error scoring task {task.get("id", "unknown")}: {str(e)}')
-                scored_tasks.append({
-                    **task,
-                    'priority_score': 0,
-                    'breakdown': {
-                        'urgency': 0,
-                        'importance': 0,
-                        'effort': 0,
-                        'dependency': 0,
-                        'days_until_due': 0
-                    },
-                    'explanation': 'Error calculating score'
-                })
-        
-        scored_tasks.sort(key=lambda x: x['priority_score'], reverse=True)
-        
-        return Response({
-            'tasks': scored_tasks,
-            'strategy_used': strategy,
-            'has_circular_dependencies': has_circular
-        }, status=status.HTTP_200_OK)
+        token, offset = parse_cursor(request.query_params.get('cursor'))
+    except ValueError:
+        return Response(
+            {'error': 'Invalid cursor'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
     
-    except Exception as e:
-        import logging
-        import traceback
-        logger = logging.getLogger(__name__)
-        logger.error(f'Error in analyze_tasks: {str(e)}\n{traceback.format_exc()}')
-        
+    stored = result_store.get(token)
+    if stored is None:
         return Response(
-            {
-                'error': 'Internal server error during analysis',
-                'message': str(e)
-            },
-            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            {'error': 'Cursor expired or unknown, run the analysis again'},
+            status=status.HTTP_404_NOT_FOUND
         )
+    return Response(page_body(token, stored, offset), status=status.HTTP_200_OK)
 
 
 @api_view(['POST'])
+@parser_classes([StreamingAnalyzeParser])
 def suggest_tasks(request):
     """
     POST /api/tasks/suggest/
     
     Get top 3 task recommendations
     """
-    serializer = AnalyzeRequestSerializer(data=request.data)
-    if not serializer.is_valid():
-        return Response(
-            {'error': 'Invalid request data', 'details': serializer.errors},
-            status=status.HTTP_400_BAD_REQUEST
-        )
-    
-    validated_data = serializer.validated_data
-    tasks = validated_data['tasks']
-    strategy = validated_data.get('strategy', 'smart_balance')
-    
-    for idx, task in enumerate(tasks):
-        if 'id' not in task or task['id'] is None:
-            task['id'] = f'task_{idx}'
-    
-    scored_tasks = []
-    for task in tasks:
-        scoring = TaskScorer.calculate_priority_score(task, tasks, strategy)
-        explanation = TaskScorer.generate_explanation(task, scoring, strategy)
-        
-        scored_task = {
-            **task,
-            'priority_score': scoring['score'],
-            'breakdown': scoring['breakdown'],
-            'explanation': explanation
-        }
-        scored_tasks.append(scored_task)
-    
-    scored_tasks.sort(key=lambda x: x['priority_score'], reverse=True)
-    top_three = scored_tasks[:3]
+    return suggest_pipeline.run(request)
+
+
+@api_view(['POST'])
+@parser_classes([SensitivityRequestParser])
+def sensitivity_analysis(request):
+    """
+    POST /api/tasks/sensitivity/
     
-    return Response({
-        'suggested_tasks': top_three,
-        'total_tasks_analyzed': len(tasks),
-        'strategy_used': strategy
-    }, status=status.HTTP_200_OK)
+    Rank stability of tasks when strategy weights are perturbed
+    """
+    # Loaded on first use: no other endpoint needs it
+    from .sensitivity import sensitivity_pipeline
+    return sensitivity_pipeline.run(request)
 
 
 @api_view(['GET'])
 def list_tasks(request):
     """GET /api/tasks/ - List all tasks"""
+    # Without a known table version there is nothing safe to tag
+    version = Task.objects.version()
+    etag = make_etag('tasks', version) if version is not None else None
+    if etag and etag_matches(request, etag):
+        return not_modified(etag)
+    
     tasks = Task.objects.all()
     serializer = TaskSerializer(tasks, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    response = Response(serializer.data, status=status.HTTP_200_OK)
+    if etag:
+        response['ETag'] = etag
+    return response
 
 
 @api_view(['POST'])
@@ -152,7 +97,7 @@ def create_task(request):
     """POST /api/tasks/create/ - Create new task"""
     serializer = TaskSerializer(data=request.data)
     if serializer.is_valid():
-        serializer.save()
+        run_write(serializer.save)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -169,16 +114,52 @@ def task_detail(request, pk):
         )
     
     if request.method == 'GET':
+        # Hash the content: updated_at misses queryset updates
         serializer = TaskSerializer(task)
-        return Response(serializer.data)
+        etag = make_etag('task', json.dumps(serializer.data, sort_keys=True, cls=DjangoJSONEncoder))
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        
+        response = Response(serializer.data)
+        response['ETag'] = etag
+        return response
     
     elif request.method == 'PUT':
         serializer = TaskSerializer(task, data=request.data)
         if serializer.is_valid():
-            serializer.save()
+            run_write(serializer.save)
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
     elif request.method == 'DELETE':
-        task.delete()
-        return Response(status=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
+        run_write(task.delete)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+def _related_tasks_response(pk, relation):
+    """Serialize the tasks reached from `pk` through the dependency index"""
+    if not Task.objects.filter(pk=pk).exists():
+        return Response(
+            {'error': 'Task not found'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    
+    related_ids = getattr(dependency_index, relation)(pk)
+    tasks_by_id = Task.objects.in_bulk(related_ids)
+    serializer = TaskSerializer(
+        [tasks_by_id[task_id] for task_id in related_ids if task_id in tasks_by_id],
+        many=True
+    )
+    return Response({'id': pk, relation: serializer.data}, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+def task_ancestors(request, pk):
+    """GET /api/tasks/<id>/ancestors/ - Tasks that must finish first"""
+    return _related_tasks_response(pk, 'ancestors')
+
+
+@api_view(['GET'])
+def task_descendants(request, pk):
+    """GET /api/tasks/<id>/descendants/ - Tasks this one ultimately blocks"""
+    return _related_tasks_response(pk, 'descendants')
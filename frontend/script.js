@@ -3,6 +3,10 @@
 let tasks = [];
 let analyzedResults = null;
 const API_BASE_URL = 'http://127.0.0.1:8000/api/tasks';
+const RESULTS_PAGE_SIZE = 50;
+let nextResultsCursor = null;
+let resultsPageRequest = null;
+let resultsObserver = null;
 
 document.addEventListener('DOMContentLoaded', () => {
     console.log('DOM Ready!');
@@ -230,7 +234,8 @@ async function analyzeTasks() {
             },
             body: JSON.stringify({
                 tasks: tasks,
-                strategy: strategy
+                strategy: strategy,
+                page_size: RESULTS_PAGE_SIZE
             }),
             signal: controller.signal
         });
@@ -260,22 +265,28 @@ async function analyzeTasks() {
         }
         
         analyzedResults = data;
+        nextResultsCursor = data.next_cursor || null;
+        const totalAnalyzed = data.total_tasks ?? data.tasks.length;
         
         if (data.has_circular_dependencies) {
             showAlert('⚠️ Warning: Circular dependencies detected in your tasks', 'warning');
         }
         
+        if (data.response_mode === 'project') {
+            showAlert('Large analysis: showing scores and explanations only', 'info');
+        }
+        
         displayResults(data.tasks);
         displayTopThree(data.tasks.slice(0, 3));
         
         const analyzedCount = document.getElementById('analyzed-count');
         if (analyzedCount) {
-            analyzedCount.textContent = data.tasks.length;
+            analyzedCount.textContent = totalAnalyzed;
         }
         
         launchConfetti();
         
-        showAlert(`✓ Successfully analyzed ${data.tasks.length} tasks using ${formatStrategyName(strategy)}`, 'success');
+        showAlert(`✓ Successfully analyzed ${totalAnalyzed} tasks using ${formatStrategyName(strategy)}`, 'success');
         
     } catch (error) {
         console.error('Analysis error:', error);
@@ -352,65 +363,165 @@ function displayResults(scoredTasks) {
         return;
     }
     
+    if (resultsObserver) {
+        resultsObserver.disconnect();
+        resultsObserver = null;
+    }
+    
     if (!scoredTasks || scoredTasks.length === 0) {
         resultsList.innerHTML = '<p style="text-align:center;color:#6b7280;">No tasks to display</p>';
         return;
     }
     
-    resultsList.innerHTML = scoredTasks.map((task, idx) => {
-        const priorityClass = getPriorityClass(task.priority_score);
-        const priorityLabel = getPriorityLabel(task.priority_score);
-        
-        return `
-            <div class="task-card ${priorityClass}">
-                <div class="task-header">
-                    <div class="task-title-section">
-                        <div>
-                            <span class="task-rank">#${idx + 1}</span>
-                            <span class="task-title">${escapeHtml(task.title)}</span>
-                        </div>
-                        <div class="task-explanation">
-                            ${escapeHtml(task.explanation)}
-                        </div>
+    resultsList.innerHTML = '';
+    appendResults(scoredTasks, 0);
+    observeResultsEnd();
+    
+    resultsSection.classList.remove('hidden');
+    resultsSection.scrollIntoView({ behavior: 'smooth', block: 'start' });
+}
+
+function appendResults(scoredTasks, startIndex) {
+    const resultsList = document.getElementById('results-list');
+    if (!resultsList) return;
+    
+    resultsList.insertAdjacentHTML('beforeend', scoredTasks.map((task, idx) => {
+        return renderResultCard(task, startIndex + idx + 1);
+    }).join(''));
+}
+
+function renderResultCard(task, rank) {
+    const priorityClass = getPriorityClass(task.priority_score);
+    const priorityLabel = getPriorityLabel(task.priority_score);
+    // Over the server's memory budget, rows are projected to id, title,
+    // score and explanation only
+    const projected = !task.breakdown;
+    
+    return `
+        <div class="task-card ${priorityClass}">
+            <div class="task-header">
+                <div class="task-title-section">
+                    <div>
+                        <span class="task-rank">#${rank}</span>
+                        <span class="task-title">${escapeHtml(task.title)}</span>
                     </div>
-                    <div class="task-score-section">
-                        <div class="task-score">${Math.round(task.priority_score)}</div>
-                        <div class="task-priority-label">${priorityLabel}</div>
+                    <div class="task-explanation">
+                        ${escapeHtml(task.explanation)}
                     </div>
                 </div>
-                
-                <div class="task-details">
-                    <div class="detail-item">
-                        <span class="detail-label">Due Date</span>
-                        <span class="detail-value">${formatDate(task.due_date)}</span>
-                    </div>
-                    <div class="detail-item">
-                        <span class="detail-label">Est. Hours</span>
-                        <span class="detail-value">${task.estimated_hours}h</span>
-                    </div>
-                    <div class="detail-item">
-                        <span class="detail-label">Importance</span>
-                        <span class="detail-value">${task.importance}/10</span>
-                    </div>
-                    <div class="detail-item">
-                        <span class="detail-label">Time Until Due</span>
-                        <span class="detail-value">${formatDaysUntilDue(task.breakdown.days_until_due)}</span>
-                    </div>
+                <div class="task-score-section">
+                    <div class="task-score">${Math.round(task.priority_score)}</div>
+                    <div class="task-priority-label">${priorityLabel}</div>
+                </div>
+            </div>
+            
+            ${projected ? '' : `
+            <div class="task-details">
+                <div class="detail-item">
+                    <span class="detail-label">Due Date</span>
+                    <span class="detail-value">${formatDate(task.due_date)}</span>
                 </div>
-                
-                <div class="task-breakdown">
-                    📊 Score breakdown: 
-                    Urgency ${Math.round(task.breakdown.urgency)} • 
-                    Importance ${Math.round(task.breakdown.importance)} • 
-                    Effort ${Math.round(task.breakdown.effort)} • 
-                    Dependency ${Math.round(task.breakdown.dependency)}
+                <div class="detail-item">
+                    <span class="detail-label">Est. Hours</span>
+                    <span class="detail-value">${task.estimated_hours}h</span>
                 </div>
+                <div class="detail-item">
+                    <span class="detail-label">Importance</span>
+                    <span class="detail-value">${task.importance}/10</span>
+                </div>
+                <div class="detail-item">
+                    <span class="detail-label">Time Until Due</span>
+                    <span class="detail-value">${formatDaysUntilDue(task.breakdown.days_until_due)}</span>
+                </div>
+            </div>
+            
+            <div class="task-breakdown">
+                📊 Score breakdown: 
+                Urgency ${Math.round(task.breakdown.urgency)} • 
+                Importance ${Math.round(task.breakdown.importance)} • 
+                Effort ${Math.round(task.breakdown.effort)} • 
+                Dependency ${Math.round(task.breakdown.dependency)}
             </div>
-        `;
-    }).join('');
+            `}
+        </div>
+    `;
+}
+
+// Load the next page of results when the end of the list scrolls into view
+function observeResultsEnd() {
+    const resultsList = document.getElementById('results-list');
+    if (!resultsList || !nextResultsCursor) return;
+    
+    const sentinel = document.createElement('div');
+    sentinel.id = 'results-sentinel';
+    sentinel.style.cssText = 'text-align:center;padding:20px;color:#667eea;';
+    sentinel.textContent = 'Loading more tasks...';
+    resultsList.appendChild(sentinel);
+    
+    if (!('IntersectionObserver' in window)) {
+        sentinel.textContent = 'Load more tasks';
+        sentinel.style.cursor = 'pointer';
+        sentinel.addEventListener('click', loadNextResultsPage);
+        return;
+    }
     
-    resultsSection.classList.remove('hidden');
-    resultsSection.scrollIntoView({ behavior: 'smooth', block: 'start' });
+    resultsObserver = new IntersectionObserver((entries) => {
+        if (entries.some(entry => entry.isIntersecting)) {
+            loadNextResultsPage();
+        }
+    }, { rootMargin: '400px' });
+    resultsObserver.observe(sentinel);
+}
+
+async function fetchResultsPage(cursor) {
+    const response = await fetch(`${API_BASE_URL}/analyze/page/?cursor=${encodeURIComponent(cursor)}`);
+    if (response.status === 404) {
+        throw new Error('These results have expired. Please analyze your tasks again.');
+    }
+    if (!response.ok) {
+        throw new Error(`HTTP error! status: ${response.status}`);
+    }
+    return response.json();
+}
+
+// Callers share one in-flight request, so scroll and export never double-load a page
+function loadNextResultsPage() {
+    if (!resultsPageRequest && nextResultsCursor && analyzedResults) {
+        resultsPageRequest = appendNextResultsPage().finally(() => {
+            resultsPageRequest = null;
+        });
+    }
+    return resultsPageRequest || Promise.resolve();
+}
+
+async function appendNextResultsPage() {
+    const results = analyzedResults;
+    const sentinel = document.getElementById('results-sentinel');
+    try {
+        const page = await fetchResultsPage(nextResultsCursor);
+        if (results !== analyzedResults) return;  // a newer analysis replaced these results
+        if (sentinel) sentinel.remove();
+        if (resultsObserver) {
+            resultsObserver.disconnect();
+            resultsObserver = null;
+        }
+        
+        appendResults(page.tasks, page.offset);
+        analyzedResults.tasks.push(...page.tasks);
+        nextResultsCursor = page.next_cursor || null;
+        analyzedResults.next_cursor = nextResultsCursor;
+        observeResultsEnd();
+    } catch (error) {
+        if (results !== analyzedResults) return;
+        console.error('Failed to load more results:', error);
+        nextResultsCursor = null;
+        if (resultsObserver) {
+            resultsObserver.disconnect();
+            resultsObserver = null;
+        }
+        if (sentinel) sentinel.remove();
+        showAlert(`Failed to load more results: ${error.message}`, 'error');
+    }
 }
 
 function displayTopThree(topTasks) {
@@ -568,12 +679,17 @@ function loadTasksFromStorage() {
     }
 }
 
-function exportResults() {
+async function exportResults() {
     if (!analyzedResults) {
         showAlert('No results to export. Please analyze tasks first.', 'warning');
         return;
     }
     
+    // Fetch any pages not scrolled to yet so the export is complete
+    while (nextResultsCursor) {
+        await loadNextResultsPage();
+    }
+    
     const dataStr = JSON.stringify(analyzedResults, null, 2);
     const dataBlob = new Blob([dataStr], { type: 'application/json' });
     const url = URL.createObjectURL(dataBlob);